@@ -0,0 +1,58 @@
+"""Scaling benchmark: grid-bucketed and NumPy CSR vs. O(n^2) star-neighborhood build.
+
+Point density is kept constant (the plane grows with n), which is the regime
+of real POI data where the grid build is ~linear and the naive build quadratic.
+
+Example:
+  python benchmarks/bench_neighbors.py --sizes 500,1000,2000,4000,8000 --features 8 --d2 10
+"""
+import argparse, csv, math, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from range_comine.synthetic import generate_synthetic
+from range_comine.neighbors import (build_star_neighborhood, build_star_neighborhood_naive,
+                                    build_star_csr, objects_to_arrays)
+
+def _time(fn, objs, d2, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(objs, d2)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark star-neighborhood construction")
+    ap.add_argument("--sizes", type=str, default="500,1000,2000,4000", help="CSV of total object counts")
+    ap.add_argument("--features", type=int, default=8)
+    ap.add_argument("--d2", type=float, default=10.0)
+    ap.add_argument("--density", type=float, default=0.01, help="Objects per unit area")
+    ap.add_argument("--max_naive", type=int, default=4000, help="Skip the naive build above this size")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=13)
+    ap.add_argument("--out", type=str, default="", help="Optional CSV output path")
+    args = ap.parse_args()
+
+    rows = []
+    print(f"{'n':>8} {'csr_ms':>10} {'grid_ms':>10} {'naive_ms':>10} {'speedup':>8}")
+    for n in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        side = math.sqrt(n / args.density)
+        objs = generate_synthetic(n_features=args.features, instances_per_feat=max(1, n // args.features),
+                                  width=side, height=side, seed=args.seed)
+        xs, ys, codes, _ = objects_to_arrays(objs)
+        csr_ms = _time(lambda _o, d2: build_star_csr(xs, ys, codes, d2), objs, args.d2, args.repeat)
+        grid_ms = _time(build_star_neighborhood, objs, args.d2, args.repeat)
+        naive_ms = _time(build_star_neighborhood_naive, objs, args.d2, args.repeat) if n <= args.max_naive else None
+        speedup = f"{naive_ms / grid_ms:.1f}x" if naive_ms else "-"
+        print(f"{len(objs):>8} {csr_ms:>10.1f} {grid_ms:>10.1f} {naive_ms if naive_ms is not None else float('nan'):>10.1f} {speedup:>8}")
+        rows.append({"n": len(objs), "csr_ms": round(csr_ms, 3), "grid_ms": round(grid_ms, 3),
+                     "naive_ms": round(naive_ms, 3) if naive_ms is not None else ""})
+    if args.out:
+        with open(args.out, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=["n", "csr_ms", "grid_ms", "naive_ms"])
+            w.writeheader(); w.writerows(rows)
+
+if __name__ == "__main__":
+    main()
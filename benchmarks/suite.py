@@ -0,0 +1,267 @@
+"""Benchmark suite: scaling curves, JSON history and regression gates.
+
+`run` times every benchmark over a grid of synthetic workloads and appends one
+record to a JSON Lines history file. Each case gets warmup runs, then `--repeat`
+timed runs (gc collected before each, no tracing); peak memory is measured in
+one separate tracemalloc run, so tracing never inflates the timings.
+
+Workloads vary one axis at a time around a base case (n, features, d2 and
+spatial clustering), which gives one scaling curve per axis. Object density is
+kept constant as n grows (the plane grows with n).
+
+`compare` matches cases between two history records (default: the last two)
+and flags median-time and peak-memory regressions above their thresholds;
+it exits with status 1 if any are found, so it can gate CI.
+
+Examples:
+  python benchmarks/suite.py run --sizes 1000,2000,4000 --features_list 4,8 --d2s 10,20 --clusters_list 0,20
+  python benchmarks/suite.py run --quick
+  python benchmarks/suite.py compare --threshold 0.10
+"""
+import argparse, gc, itertools, json, math, os, platform, random, statistics, subprocess, sys, time, tracemalloc
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from range_comine.synthetic import generate_synthetic
+from range_comine.context import DatasetContext
+from range_comine.neighbors import build_star_neighborhood, build_star_arrays, build_star_csr
+from range_comine.instances import size2_tables, join_tables, first_participation
+from range_comine.metrics import critical_distance_sweep
+from range_comine.mining import range_comine, filter_k_cliques
+from range_comine.baselines import naive_range, range_inc_mining
+
+HISTORY = Path(__file__).resolve().parent / "results" / "history.jsonl"
+
+def make_objects(n, features, clusters=0, density=0.01, seed=13):
+    """n objects over a square of constant density; clusters > 0 draws them around that many Gaussian centers."""
+    side = math.sqrt(n / density)
+    if not clusters:
+        return generate_synthetic(n_features=features, instances_per_feat=max(1, n // features),
+                                  width=side, height=side, seed=seed)
+    rng = random.Random(seed)
+    centers = [(rng.uniform(0, side), rng.uniform(0, side)) for _ in range(clusters)]
+    spread = side / (4 * math.sqrt(clusters))
+    objs = []
+    for f in range(features):
+        name = chr(ord('A') + f) if features <= 26 else f"F{f}"
+        for i in range(max(1, n // features)):
+            cx, cy = rng.choice(centers)
+            objs.append((f"{name}.{i}", name, rng.gauss(cx, spread), rng.gauss(cy, spread)))
+    return objs
+
+# Each benchmark: setup(objs, case) -> zero-argument callable that does the measured work.
+def _star_grid(objs, case):
+    return lambda: build_star_neighborhood(objs, case["d2"])
+
+def _star_arrays(objs, case):
+    ctx = DatasetContext.from_objects(objs)
+    return lambda: build_star_arrays(ctx.xs, ctx.ys, ctx.codes, case["d2"])
+
+def _star_csr(objs, case):
+    ctx = DatasetContext.from_objects(objs)
+    xs, ys, codes = np.asarray(ctx.xs), np.asarray(ctx.ys), np.asarray(ctx.codes, dtype=np.int32)
+    return lambda: build_star_csr(xs, ys, codes, case["d2"])
+
+def _size2(objs, case):
+    ctx = DatasetContext.from_objects(objs)
+    star = build_star_arrays(ctx.xs, ctx.ys, ctx.codes, case["d2"])
+    return lambda: size2_tables(star, ctx.codes, case["d2"])
+
+def _pair_tables(objs, case):
+    ctx = DatasetContext.from_objects(objs)
+    star = build_star_arrays(ctx.xs, ctx.ys, ctx.codes, case["d2"])
+    return ctx, size2_tables(star, ctx.codes, case["d2"])
+
+def _join_k3(objs, case):
+    ctx, pairs = _pair_tables(objs, case)
+    triples = [c for c in itertools.combinations(range(len(ctx.features)), 3)
+               if c[:-1] in pairs and c[:-2] + c[-1:] in pairs]
+    return lambda: [join_tables(pairs[c[:-1]], pairs[c[:-2] + c[-1:]], ctx.xs, ctx.ys, case["d2"]) for c in triples]
+
+def _joinless_k3(objs, case):
+    star, objects_by_id, features = build_star_neighborhood(objs, case["d2"])
+    triples = list(itertools.combinations(features, 3))
+    return lambda: [filter_k_cliques(c, star, objects_by_id, case["d2"]) for c in triples]
+
+def _critical(objs, case):
+    ctx, pairs = _pair_tables(objs, case)
+    work = [(first_participation(t), t.dias) for t in pairs.values()]
+    return lambda: [critical_distance_sweep(first, ctx.codes, ctx.totals, case["min_prev"], case["d1"], dias)
+                    for first, dias in work]
+
+def _end_to_end(fn):
+    def setup(objs, case):
+        return lambda: fn(objs, case["d1"], case["d2"], case["min_prev"])
+    return setup
+
+BENCHES = {
+    "star_grid": (_star_grid, None),
+    "star_arrays": (_star_arrays, None),
+    "star_csr": (_star_csr, None),
+    "size2_tables": (_size2, None),
+    "join_k3": (_join_k3, None),
+    "joinless_k3": (_joinless_k3, 4000),
+    "critical_sweep": (_critical, None),
+    "range_comine": (_end_to_end(range_comine), None),
+    "range_inc": (_end_to_end(range_inc_mining), 1000),
+    "naive": (_end_to_end(naive_range), 150),
+}   # name -> (setup, largest n it runs on; None = no limit)
+
+def time_case(fn, repeat, warmup):
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return times
+
+def peak_memory_kb(fn):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024.0
+    finally:
+        tracemalloc.stop()
+
+def workload_cases(base, axes):
+    """Base case plus one case per value of each axis (others at base), deduplicated."""
+    cases = [dict(base)]
+    for key, values in axes.items():
+        for v in values:
+            case = dict(base, **{key: v})
+            if case not in cases:
+                cases.append(case)
+    return cases
+
+def case_key(bench, case):
+    return bench + "|" + ",".join(f"{k}={case[k]}" for k in sorted(case))
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).resolve().parents[1], timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_suite(cases, benches, repeat=5, warmup=1, memory=True, log=print):
+    results = []
+    for case in cases:
+        objs = make_objects(case["n"], case["features"], case["clusters"], seed=case["seed"])
+        for name in benches:
+            setup, max_n = BENCHES[name]
+            if max_n is not None and case["n"] > max_n:
+                continue
+            fn = setup(objs, case)
+            times = time_case(fn, repeat, warmup)
+            row = {"bench": name, "case": case, "key": case_key(name, case), "times_ms": [round(t, 3) for t in times],
+                   "min_ms": round(min(times), 3), "median_ms": round(statistics.median(times), 3),
+                   "peak_kb": round(peak_memory_kb(fn), 1) if memory else None}
+            results.append(row)
+            log(f"{row['key']:<70} median {row['median_ms']:>10.2f} ms  min {row['min_ms']:>10.2f} ms"
+                + (f"  peak {row['peak_kb']:>10.1f} KB" if memory else ""))
+    return results
+
+def append_history(path, results, config):
+    record = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "commit": _git_commit(),
+              "python": platform.python_version(), "platform": platform.platform(),
+              "cpus": os.cpu_count(), "config": config, "results": results}
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+    return record
+
+def load_history(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def compare_records(base, head, threshold=0.10, memory_threshold=0.20):
+    """Per matching case: relative change of median time and peak memory; flags those above threshold."""
+    before = {r["key"]: r for r in base["results"]}
+    rows = []
+    for r in head["results"]:
+        b = before.get(r["key"])
+        if b is None:
+            continue
+        dt = r["median_ms"] / b["median_ms"] - 1 if b["median_ms"] else 0.0
+        dm = (r["peak_kb"] / b["peak_kb"] - 1) if r.get("peak_kb") and b.get("peak_kb") else None
+        rows.append({"key": r["key"], "base_ms": b["median_ms"], "head_ms": r["median_ms"], "time_change": dt,
+                     "base_kb": b.get("peak_kb"), "head_kb": r.get("peak_kb"), "memory_change": dm,
+                     "time_regression": dt > threshold,
+                     "memory_regression": dm is not None and dm > memory_threshold})
+    return rows
+
+def _csv_list(s, cast):
+    return [cast(x) for x in s.split(",") if x.strip()]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Range–CoMine benchmark suite")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="Run benchmarks and append a record to the history")
+    r.add_argument("--benches", type=str, default=",".join(BENCHES), help="CSV of benchmarks")
+    r.add_argument("--n", type=int, default=1000, help="Base object count")
+    r.add_argument("--features", type=int, default=4, help="Base feature count")
+    r.add_argument("--d1", type=float, default=5.0)
+    r.add_argument("--d2", type=float, default=15.0, help="Base d2")
+    r.add_argument("--min_prev", type=float, default=0.3)
+    r.add_argument("--clusters", type=int, default=0, help="Base clustering (0 = uniform)")
+    r.add_argument("--sizes", type=str, default="", help="CSV of n values (scaling curve)")
+    r.add_argument("--features_list", type=str, default="", help="CSV of feature counts")
+    r.add_argument("--d2s", type=str, default="", help="CSV of d2 values")
+    r.add_argument("--clusters_list", type=str, default="", help="CSV of cluster counts (0 = uniform)")
+    r.add_argument("--repeat", type=int, default=5)
+    r.add_argument("--warmup", type=int, default=1)
+    r.add_argument("--seed", type=int, default=13)
+    r.add_argument("--no_memory", action="store_true", help="Skip the separate peak-memory run")
+    r.add_argument("--quick", action="store_true", help="Small base case, 3 repeats (smoke run)")
+    r.add_argument("--history", type=str, default=str(HISTORY))
+    c = sub.add_parser("compare", help="Compare two history records and flag regressions")
+    c.add_argument("--history", type=str, default=str(HISTORY))
+    c.add_argument("--base", type=int, default=-2, help="Index of the baseline record (default: second to last)")
+    c.add_argument("--head", type=int, default=-1, help="Index of the compared record (default: last)")
+    c.add_argument("--threshold", type=float, default=0.10, help="Median-time regression threshold (0.10 = +10%%)")
+    c.add_argument("--memory_threshold", type=float, default=0.20, help="Peak-memory regression threshold")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "run":
+        if args.quick:
+            args.n, args.repeat = min(args.n, 200), min(args.repeat, 3)
+        base = {"n": args.n, "features": args.features, "d1": args.d1, "d2": args.d2,
+                "min_prev": args.min_prev, "clusters": args.clusters, "seed": args.seed}
+        axes = {"n": _csv_list(args.sizes, int), "features": _csv_list(args.features_list, int),
+                "d2": _csv_list(args.d2s, float), "clusters": _csv_list(args.clusters_list, int)}
+        benches = _csv_list(args.benches, str)
+        unknown = set(benches) - set(BENCHES)
+        if unknown:
+            ap.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+        results = run_suite(workload_cases(base, axes), benches, args.repeat, args.warmup, not args.no_memory)
+        append_history(args.history, results, {"base": base, "axes": axes, "repeat": args.repeat,
+                                               "warmup": args.warmup})
+        print(f"Appended {len(results)} results to {args.history}")
+        return 0
+
+    history = load_history(args.history)
+    if len(history) < 2 and args.base == -2:
+        print("Need at least two records to compare")
+        return 0
+    base, head = history[args.base], history[args.head]
+    rows = compare_records(base, head, args.threshold, args.memory_threshold)
+    print(f"base {base.get('commit')} ({base['timestamp']}) -> head {head.get('commit')} ({head['timestamp']})")
+    for row in rows:
+        flag = " ".join(f for f, on in (("TIME", row["time_regression"]), ("MEMORY", row["memory_regression"])) if on)
+        mem = f"{row['memory_change']:+7.1%}" if row["memory_change"] is not None else "      -"
+        print(f"{row['key']:<70} {row['base_ms']:>10.2f} -> {row['head_ms']:>10.2f} ms {row['time_change']:+7.1%}"
+              f"  mem {mem}  {flag}")
+    regressions = [r for r in rows if r["time_regression"] or r["memory_regression"]]
+    print(f"{len(regressions)} regression(s) in {len(rows)} matched cases")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,14 +10,17 @@ Examples:
   python experiments.py --mode min_prev --mins 0.2,0.4,0.6 --d1 10 --d2 35 --features 4 --instances 8 --seed 13 --algos range,naive,range_inc --export_svg
   python experiments.py --mode range --min_prev 0.5 --d1s 5,10 --d2s 20,30 --csv examples/toy.csv --export_svg
 """
-import os, csv, argparse, time, tracemalloc, statistics as stats
+import os, csv, json, argparse, time, tracemalloc, statistics as stats
 from pathlib import Path
 import matplotlib.pyplot as plt
 
 from range_comine.synthetic import generate_synthetic
 from range_comine.data import load_objects_csv
+from range_comine.store import open_dataset, dataset_objects
 from range_comine.mining import range_comine
 from range_comine.baselines import naive_range, range_inc_mining
+from range_comine.cache import InstanceCache
+from range_comine.stats import MiningStats
 
 PLOTS = Path("plots"); PLOTS.mkdir(exist_ok=True, parents=True)
 
@@ -27,6 +30,29 @@ ALGOS = {
     "range_inc": ("RangeInc-Mining", range_inc_mining),
 }
 
+def _make_cache(args):
+    return InstanceCache(max_bytes=int(args.cache_mb * 2**20)) if getattr(args, "cache", False) else None
+
+def _algo(a, cache):
+    # with --cache, Range–CoMine answers every sweep point from one materialization
+    name, fn = ALGOS[a]
+    if cache is not None and a == "range":
+        fn = cache.range_comine
+    return name, fn
+
+def _new_stats(args, a, params):
+    # with --stats, one MiningStats per sweep point, dumped by _write_stats
+    if not args.stats:
+        return None
+    run_stats = MiningStats()
+    args.stats_runs.append({"algo": a, **params, "stats": run_stats})
+    return run_stats
+
+def _write_stats(args):
+    runs = [dict(r, stats=r["stats"].to_dict()) for r in args.stats_runs]
+    with open(args.stats, "w") as f:
+        json.dump(runs, f, indent=2)
+
 def _count_patterns(col):
     s = set()
     for d, pats in col.items():
@@ -42,6 +68,8 @@ def _ensure_list_str(csvish):
     return []
 
 def _get_objects(args):
+    if args.data:
+        return dataset_objects(open_dataset(args.data))
     if args.csv:
         return load_objects_csv(args.csv)
     return generate_synthetic(n_features=args.features, instances_per_feat=args.instances, seed=args.seed)
@@ -54,12 +82,17 @@ def _savefig(basepath, export_svg=False):
         plt.savefig(svg_path)
     plt.close()
 
-def _run_profiled(fn, objs, d1, d2, min_prev):
-    # measure wall time ms and peak kb using tracemalloc
-    tracemalloc.start()
+def _run_profiled(fn, objs, d1, d2, min_prev, run_stats=None):
+    # wall time ms of an untraced run, then peak kb from a separate tracemalloc run
+    # (tracing slows allocation-heavy code, so it never overlaps the timed run);
+    # benchmarks/suite.py does repeated, warmed-up measurements.
+    # run_stats (MiningStats) is filled by the timed run, so its phase times are untraced
+    extra = {} if run_stats is None else {"stats": run_stats}
     t0 = time.perf_counter()
-    col = fn(objs, d1=float(d1), d2=float(d2), min_prev=float(min_prev))
+    col = fn(objs, d1=float(d1), d2=float(d2), min_prev=float(min_prev), **extra)
     elapsed_ms = (time.perf_counter() - t0) * 1000.0
+    tracemalloc.start()
+    fn(objs, d1=float(d1), d2=float(d2), min_prev=float(min_prev))
     current, peak = tracemalloc.get_traced_memory()
     tracemalloc.stop()
     peak_kb = peak / 1024.0
@@ -70,11 +103,13 @@ def sweep_min_prev(args, mins, d1=10.0, d2=35.0, algos=("range","naive","range_i
     xs = [float(x) for x in mins]
     series = {}
     overlay = {}
+    cache = _make_cache(args)
     for a in algos:
-        name, fn = ALGOS[a]
+        name, fn = _algo(a, cache)
         rows, ys, times, mems = [], [], [], []
         for m in xs:
-            col, t_ms, pk_kb = _run_profiled(fn, objs, d1, d2, m)
+            run_stats = _new_stats(args, a, {"min_prev": m, "d1": d1, "d2": d2})
+            col, t_ms, pk_kb = _run_profiled(fn, objs, d1, d2, m, run_stats)
             cnt = _count_patterns(col)
             rows.append({"min_prev": m, "num_patterns": cnt, "time_ms": round(t_ms,3), "peak_kb": round(pk_kb,1)})
             ys.append(cnt); times.append(t_ms); mems.append(pk_kb)
@@ -111,11 +146,15 @@ def sweep_range(args, min_prev=0.5, d1s=(5,10,15), d2s=(20,25,30,35), algos=("ra
     xs = list(range(len(pairs)))
     series = {}
     overlay = {}
+    cache = _make_cache(args)
+    if cache is not None and pairs:
+        cache.prepare(objs, max(d2 for _, d2 in pairs))
     for a in algos:
-        name, fn = ALGOS[a]
+        name, fn = _algo(a, cache)
         rows, ys, times, mems = [], [], [], []
         for (d1, d2) in pairs:
-            col, t_ms, pk_kb = _run_profiled(fn, objs, d1, d2, min_prev)
+            run_stats = _new_stats(args, a, {"min_prev": min_prev, "d1": d1, "d2": d2})
+            col, t_ms, pk_kb = _run_profiled(fn, objs, d1, d2, min_prev, run_stats)
             cnt = _count_patterns(col)
             rows.append({"d1": d1, "d2": d2, "num_patterns": cnt, "time_ms": round(t_ms,3), "peak_kb": round(pk_kb,1)})
             ys.append(cnt); times.append(t_ms); mems.append(pk_kb)
@@ -159,13 +198,18 @@ def parse_args():
     ap.add_argument("--instances", type=int, default=8, help="Instances per feature for synthetic data")
     ap.add_argument("--seed", type=int, default=13, help="Random seed for synthetic data")
     ap.add_argument("--csv", type=str, default="", help="Path to CSV dataset (overrides synthetic)")
+    ap.add_argument("--data", type=str, default="", help="Dataset directory from `range_comine.cli convert` (overrides --csv)")
     ap.add_argument("--algos", type=str, default="range,naive,range_inc", help="CSV of algos to include (range,naive,range_inc)")
     ap.add_argument("--export_svg", action="store_true", help="Also export SVG versions of plots")
+    ap.add_argument("--cache", action="store_true", help="Reuse neighborhoods/instances across sweep points (Range–CoMine)")
+    ap.add_argument("--cache_mb", type=float, default=512.0, help="Memory budget of the instance cache (MB)")
+    ap.add_argument("--stats", type=str, default="", help="Write per-run phase times and level counters (JSON) here")
     return ap.parse_args()
 
 def main():
     args = parse_args()
     algos = _ensure_list_str(args.algos)
+    args.stats_runs = []
     if args.mode == "min_prev":
         mins = _ensure_list_str(args.mins)
         sweep_min_prev(args, mins, d1=float(args.d1), d2=float(args.d2), algos=algos)
@@ -173,6 +217,8 @@ def main():
         d1s = [float(x) for x in _ensure_list_str(args.d1s)]
         d2s = [float(x) for x in _ensure_list_str(args.d2s)]
         sweep_range(args, min_prev=float(args.min_prev), d1s=d1s, d2s=d2s, algos=algos)
+    if args.stats:
+        _write_stats(args)
 
 if __name__ == "__main__":
     main()
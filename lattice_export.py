@@ -8,6 +8,8 @@ from pathlib import Path
 import matplotlib.pyplot as plt
 
 from range_comine.synthetic import generate_synthetic
+from range_comine.data import load_objects_csv
+from range_comine.store import open_dataset, dataset_objects
 from range_comine.mining import range_comine
 
 PLOTS = Path("plots"); PLOTS.mkdir(exist_ok=True, parents=True)
@@ -81,11 +83,18 @@ def main():
     ap.add_argument("--features", type=int, default=4)
     ap.add_argument("--instances", type=int, default=5)
     ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--csv", type=str, default="", help="Path to CSV dataset (overrides synthetic)")
+    ap.add_argument("--data", type=str, default="", help="Dataset directory from `range_comine.cli convert` (overrides --csv)")
     ap.add_argument("--cross_level", action="store_true", help="Draw cross-level parent→child edges")
     ap.add_argument("--png", action="store_true", help="Also save PNG")
     args = ap.parse_args()
 
-    objs = generate_synthetic(n_features=args.features, instances_per_feat=args.instances, seed=args.seed)
+    if args.data:
+        objs = dataset_objects(open_dataset(args.data))
+    elif args.csv:
+        objs = load_objects_csv(args.csv)
+    else:
+        objs = generate_synthetic(n_features=args.features, instances_per_feat=args.instances, seed=args.seed)
     ColList = range_comine(objs, d1=args.d1, d2=args.d2, min_prev=args.min_prev)
     levels, positions, edges_same, edges_cross = lattice_positions(ColList)
 
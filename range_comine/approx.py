@@ -0,0 +1,207 @@
+"""Approximate Range–CoMine by stratified instance sampling.
+
+Each feature's objects are sampled (a fraction per feature, at least
+`min_sample`). For a candidate pattern only the sampled objects are examined:
+a local branch-and-bound search over the full data finds each one's
+first-participation distance (the smallest diameter of a clique of the pattern
+containing it, with diameter >= the CDMP bound, as in range_comine). The
+sampled fraction of participating objects estimates each participation ratio;
+per-feature normal intervals with finite-population correction give PI bounds,
+and sweeping them gives bounds on the critical distance. For k >= 3 the CDMP
+bound itself comes from the estimated subpattern distances, so those bounds
+hold given that estimate. Patterns whose
+prevalence is uncertain can be re-evaluated exactly
+(`verify=True`), with every object of their features.
+
+Objects within d2 of a sampled object are found through a uniform grid; no
+instance table is ever built, so the cost scales with the sample, not with the
+number of cliques.
+"""
+from typing import Dict, NamedTuple
+from collections import defaultdict
+from statistics import NormalDist
+import itertools, math, random
+
+from .context import DatasetContext
+from .neighbors import grid_index, grid_candidates, cell_of
+from .mining import candidate_join
+
+class PatternEstimate(NamedTuple):
+    critical: float        # estimated critical distance
+    critical_lo: float     # bounds from the PI confidence band (None = not reached by d2)
+    critical_hi: float
+    pi: float              # estimated PI at d2 (over instances >= the CDMP bound)
+    pi_lo: float
+    pi_hi: float
+    verified: bool         # re-evaluated exactly
+
+class ApproxResult(NamedTuple):
+    colist: Dict[float, list]            # as range_comine, from the estimates
+    patterns: Dict[tuple, PatternEstimate]
+
+def _ratio_interval(hits: int, n: int, total: int, z: float):
+    """Normal interval for a sampled proportion, with finite-population correction."""
+    p = hits / n
+    if n >= total:
+        return p, p
+    half = z * math.sqrt(p * (1 - p) / n * (total - n) / (total - 1))
+    return max(0.0, p - half), min(1.0, p + half)
+
+class _LocalCliques:
+    """Per-object neighborhoods within d2 and min-diameter clique search around one object."""
+    def __init__(self, ctx: DatasetContext, d2: float):
+        self.ctx, self.d2 = ctx, d2
+        self.cell = d2 if d2 > 0 else 1.0
+        self.grid = grid_index(ctx.xs, ctx.ys, self.cell)
+        self.neigh = {}
+
+    def neighbors(self, o: int) -> Dict[int, list]:
+        """feature code -> [(distance, object)] within d2 of o, nearest first."""
+        out = self.neigh.get(o)
+        if out is None:
+            xs, ys, codes, d2 = self.ctx.xs, self.ctx.ys, self.ctx.codes, self.d2
+            out = {}
+            for j in grid_candidates(self.grid, cell_of(xs[o], ys[o], self.cell)):
+                if j == o:
+                    continue
+                d = math.hypot(xs[o] - xs[j], ys[o] - ys[j])
+                if d <= d2:
+                    out.setdefault(codes[j], []).append((d, j))
+            for lst in out.values():
+                lst.sort()
+            self.neigh[o] = out
+        return out
+
+    def first(self, o: int, cand: tuple, lo: float):
+        """Smallest diameter >= lo of a clique of `cand` containing o, or None."""
+        xs, ys, d2 = self.ctx.xs, self.ctx.ys, self.d2
+        neigh = self.neighbors(o)
+        c = self.ctx.codes[o]
+        lists = sorted((neigh.get(g, []) for g in cand if g != c), key=len)
+        if not lists or not lists[0]:
+            return None
+        best = math.inf
+        chosen = []
+
+        def grow(i, dia):
+            nonlocal best
+            if i == len(lists):
+                if lo <= dia < best:
+                    best = dia
+                return
+            for dj, j in lists[i]:
+                if dj >= best:
+                    break
+                nd = dia if dia > dj else dj
+                for a in chosen:
+                    e = math.hypot(xs[a] - xs[j], ys[a] - ys[j])
+                    if e > d2 or e >= best:
+                        break
+                    if e > nd:
+                        nd = e
+                else:
+                    chosen.append(j)
+                    grow(i + 1, nd)
+                    chosen.pop()
+
+        grow(0, 0.0)
+        return best if best < math.inf else None
+
+def _sweep(firsts: Dict[int, list], sizes: Dict[int, int], totals, min_prev: float, z: float, d2: float):
+    """
+    Smallest distance where min over features of the estimated ratio (and of its
+    upper / lower bound) reaches min_prev. firsts: code -> sampled first-participation
+    distances (participating objects only).
+    Returns (estimate, lo, hi), each None if not reached by d2.
+    """
+    events = sorted((d, c) for c, ds in firsts.items() for d in ds if d <= d2)
+    hits = {c: 0 for c in sizes}
+    found = [None, None, None]   # point estimate, from upper bounds (lo), from lower bounds (hi)
+    def check(d):
+        ratios = [(hits[c] / sizes[c],) + _ratio_interval(hits[c], sizes[c], totals[c], z) for c in sizes]
+        for slot, idx in ((0, 0), (1, 2), (2, 1)):
+            if found[slot] is None and min(r[idx] for r in ratios) >= min_prev:
+                found[slot] = d
+    check(-math.inf)
+    for i, (d, c) in enumerate(events):
+        hits[c] += 1
+        if i + 1 < len(events) and events[i + 1][0] == d:
+            continue
+        check(d)
+        if found[2] is not None:
+            break
+    return tuple(found)
+
+def range_comine_approx(objects, d1: float, d2: float, min_prev: float, fraction: float = 0.1,
+                        min_sample: int = 30, confidence: float = 0.95, verify: bool = False,
+                        seed: int = 0) -> ApproxResult:
+    """
+    Approximate Range–CoMine from a stratified sample of each feature's objects.
+    fraction / min_sample: per-feature sample size max(min_sample, fraction * count), capped at count
+    confidence: level of the per-feature participation-ratio intervals
+    verify: re-evaluate exactly every pattern whose prevalence is uncertain
+      (its PI band at d2 straddles min_prev)
+    Prevalence and the Apriori growth follow the point estimates (or the exact values
+    of verified patterns); `colist` has the same shape as range_comine's ColList.
+    """
+    ctx = DatasetContext.from_objects(objects)
+    codes, totals = ctx.codes, ctx.totals
+    F = len(ctx.features)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    rng = random.Random(seed)
+    by_code = defaultdict(list)
+    for o in range(len(codes)):
+        by_code[codes[o]].append(o)
+    sample = {c: sorted(rng.sample(objs, min(len(objs), max(min_sample, math.ceil(fraction * len(objs))))))
+              for c, objs in by_code.items()}
+    local = _LocalCliques(ctx, d2)
+
+    def estimate(cand, min_allowed, members):
+        firsts, sizes = {}, {}
+        for c in cand:
+            ds = [local.first(o, cand, min_allowed) for o in members[c]]
+            firsts[c] = [d for d in ds if d is not None]
+            sizes[c] = len(members[c])
+        ratio = {c: _ratio_interval(len(firsts[c]), sizes[c], totals[c], z) for c in cand}
+        pi = min(len(firsts[c]) / sizes[c] for c in cand)
+        pi_lo, pi_hi = min(r[0] for r in ratio.values()), min(r[1] for r in ratio.values())
+        cr, cr_lo, cr_hi = _sweep(firsts, sizes, totals, min_prev, z, d2)
+        if min_prev <= 0 and not any(firsts.values()):
+            cr = cr_lo = cr_hi = None   # no instance at all
+        # PI reached below d1: the answer is the first clique diameter >= d1; the
+        # sampled objects only bound it from above (exact when every object is used)
+        if any(x is not None and x < d1 for x in (cr, cr_lo, cr_hi)):
+            lo = max(d1, min_allowed)
+            fallback = min((d for d in (local.first(o, cand, lo) for c in cand for o in members[c]) if d is not None),
+                           default=None)
+            exact = all(sizes[c] == totals[c] for c in cand)
+            cr, cr_hi = (fallback if x is not None and x < d1 else x for x in (cr, cr_hi))
+            if cr_lo is not None and cr_lo < d1:
+                cr_lo = fallback if exact or fallback is None else lo
+        return PatternEstimate(cr, cr_lo, cr_hi, pi, pi_lo, pi_hi, False)
+
+    ColList = defaultdict(list)
+    for c in range(F):
+        ColList[d1].append((c,))
+    critical = { (c,): d1 for c in range(F) }
+    estimates = {}
+    P_prev = [(c,) for c in range(F)]
+    k = 2
+    while P_prev:
+        Ck = candidate_join(P_prev) if k>2 else list(itertools.combinations(range(F), 2))
+        Pk = []
+        for cand in Ck:
+            min_allowed = -math.inf if k == 2 else max(critical[s] for s in itertools.combinations(cand, k-1))
+            est = estimate(cand, min_allowed, sample)
+            if verify and est.pi_lo < min_prev <= est.pi_hi:
+                est = estimate(cand, min_allowed, by_code)._replace(verified=True)
+            if est.critical is None:
+                continue
+            Pk.append(cand)
+            critical[cand] = est.critical
+            ColList[est.critical].append(cand)
+            estimates[ctx.pattern_names(cand)] = est
+        P_prev = Pk
+        k += 1
+    colist = dict(sorted((d, sorted(ctx.pattern_names(p) for p in v)) for d,v in ColList.items()))
+    return ApproxResult(colist, estimates)
@@ -1,9 +1,12 @@
 
 from typing import List, Dict, Tuple
 from collections import defaultdict
-import itertools, math
+import itertools, math, time
 from .neighbors import build_star_neighborhood
-from .mining import enumerate_size2_cliques, filter_k_cliques, candidate_join
+from .mining import size2_cliques_by_pair, filter_k_cliques, candidate_join
+from .context import DatasetContext, ensure_context
+from .metrics import participation_index
+from .stats import MiningStats, phase
 
 def _pair_distances(star, objects_by_id, d1, d2):
     seen = set()
@@ -20,35 +23,29 @@ def _pair_distances(star, objects_by_id, d1, d2):
                 dists.add(dist)
     return sorted(dists, reverse=True)
 
-def _prevalent_at(objects_by_id, patterns, cliques_by_pat, min_prev):
+def _prevalent_at(objects_by_id, patterns, cliques_by_pat, min_prev, ctx: DatasetContext = None):
+    ctx = ensure_context(objects_by_id, ctx)
     prev = []
     for pat in patterns:
         cliques = cliques_by_pat.get(pat, [])
         if not cliques: 
             continue
-        feats = set(pat)
-        totals = {f:0 for f in feats}
-        for oid,obj in objects_by_id.items():
-            if obj[1] in feats:
-                totals[obj[1]] += 1
-        seen = {f:set() for f in feats}
-        for cid,_ in cliques:
-            for oid in cid:
-                f = objects_by_id[oid][1]
-                if f in feats:
-                    seen[f].add(oid)
-        pi = min(len(seen[f])/totals[f] for f in feats)
-        if pi >= min_prev:
+        if participation_index(cliques, objects_by_id, ctx) >= min_prev:
             prev.append(pat)
     return prev
 
-def _cliques_at_distance(objects_by_id, star, features, d):
+def _cliques_at_distance(objects_by_id, star, features, d, stats: MiningStats = None):
     # build cliques for all patterns at threshold d (recompute)
     cliques_by_pat = {}
-    # k=2
+    # k=2: all pairs in one pass over the star
+    pairs = size2_cliques_by_pair(star, objects_by_id, d)
     for pair in itertools.combinations(features, 2):
         cand = tuple(sorted(pair))
-        cliques_by_pat[cand] = [(cid, dia) for (cid, dia) in enumerate_size2_cliques(cand, star, objects_by_id, d) if dia <= d]
+        cliques_by_pat[cand] = pairs.get(cand, [])
+    if stats is not None:
+        stats.count(2, "candidates", len(cliques_by_pat))
+        stats.count(2, "instances", sum(len(c) for c in cliques_by_pat.values()))
+        stats.peak(2, "peak_table", max((len(c) for c in cliques_by_pat.values()), default=0))
     # k>=3 (naive enumeration)
     k = 3
     prev = [tuple(sorted(p)) for p in itertools.combinations(features, 2)]
@@ -60,26 +57,43 @@ def _cliques_at_distance(objects_by_id, star, features, d):
             if clqs:
                 cliques_by_pat[cand] = clqs
                 new_prev.append(cand)
+            if stats is not None:
+                stats.count(k, "instances", len(clqs))
+                stats.peak(k, "peak_table", len(clqs))
+        if stats is not None:
+            stats.count(k, "candidates", len(Ck))
         prev = new_prev
         k += 1
     return cliques_by_pat
 
-def naive_range(objects, d1: float, d2: float, min_prev: float):
-    star, objects_by_id, features = build_star_neighborhood(objects, d2)
+def naive_range(objects, d1: float, d2: float, min_prev: float, stats: MiningStats = None):
+    """Re-mines every pattern at every candidate distance of D_pair.
+    stats: optional MiningStats; level counters add up over all distances."""
+    with phase(stats, "star"):
+        star, objects_by_id, features = build_star_neighborhood(objects, d2)
+        ctx = DatasetContext(objects_by_id)
     # candidate distances (D_pair) from star at d2, desc
-    Dpair = _pair_distances(star, objects_by_id, d1, d2)
+    with phase(stats, "pair_distances"):
+        Dpair = _pair_distances(star, objects_by_id, d1, d2)
     if not Dpair:
         return {}
     ColList = defaultdict(list)
     # initial at first (largest) distance
-    clq_prev = _cliques_at_distance(objects_by_id, star, features, Dpair[0])
+    with phase(stats, "cliques"):
+        clq_prev = _cliques_at_distance(objects_by_id, star, features, Dpair[0], stats)
     patterns_all = sorted(set(list(clq_prev.keys())))
-    prev_prev = _prevalent_at(objects_by_id, patterns_all, clq_prev, min_prev)
+    with phase(stats, "pi"):
+        prev_prev = _prevalent_at(objects_by_id, patterns_all, clq_prev, min_prev, ctx)
+    if stats is not None:
+        for pat in prev_prev:
+            stats.count(len(pat), "prevalent")
     # compare against next distances
     for i in range(1, len(Dpair)):
         d = Dpair[i]
-        clq_now = _cliques_at_distance(objects_by_id, star, features, d)
-        now_prev = _prevalent_at(objects_by_id, patterns_all, clq_now, min_prev)
+        with phase(stats, "cliques"):
+            clq_now = _cliques_at_distance(objects_by_id, star, features, d, stats)
+        with phase(stats, "pi"):
+            now_prev = _prevalent_at(objects_by_id, patterns_all, clq_now, min_prev, ctx)
         # Cchanged = prev_prev \ now_prev
         changed = sorted(set(prev_prev) - set(now_prev))
         if changed:
@@ -87,25 +101,79 @@ def naive_range(objects, d1: float, d2: float, min_prev: float):
         prev_prev = now_prev
     return dict(sorted((k, sorted(v)) for k,v in ColList.items()))
 
-def range_inc_mining(objects, d1: float, d2: float, min_prev: float):
-    """Incremental over descending D_pair. We reuse cliques and drop those whose diameter > d."""
-    star, objects_by_id, features = build_star_neighborhood(objects, d2)
-    Dpair = _pair_distances(star, objects_by_id, d1, d2)
+def range_inc_mining(objects, d1: float, d2: float, min_prev: float, stats: MiningStats = None):
+    """Incremental over descending D_pair. We reuse cliques and drop those whose diameter > d.
+
+    Event-driven: all cliques are removed once, in descending diameter order. Per
+    pattern we count cliques per object and participating objects per feature;
+    a feature count only drops when an object's last clique disappears, and a
+    pattern is flagged non-prevalent the moment a feature falls below min_prev
+    (PI never recovers as d shrinks). Same ColList as re-checking every pattern
+    at every distance.
+    stats: optional MiningStats
+    """
+    with phase(stats, "star"):
+        star, objects_by_id, features = build_star_neighborhood(objects, d2)
+        ctx = DatasetContext(objects_by_id)
+    with phase(stats, "pair_distances"):
+        Dpair = _pair_distances(star, objects_by_id, d1, d2)
     if not Dpair:
         return {}
-    ColList = defaultdict(list)
+    feat_of, totals = ctx.feature_of, ctx.feature_totals
     # compute cliques at first distance (largest)
-    cliques_by_pat = _cliques_at_distance(objects_by_id, star, features, Dpair[0])
-    patterns_all = sorted(set(list(cliques_by_pat.keys())))
-    prev_prev = _prevalent_at(objects_by_id, patterns_all, cliques_by_pat, min_prev)
+    with phase(stats, "cliques"):
+        cliques_by_pat = _cliques_at_distance(objects_by_id, star, features, Dpair[0], stats)
+    t0 = time.perf_counter() if stats is not None else 0.0
+    obj_count, feat_count, remaining = {}, {}, {}
+    prevalent = set()
+    events = []
+    for pat, cliques in cliques_by_pat.items():
+        oc = defaultdict(int)
+        for cid, dia in cliques:
+            events.append((dia, pat, cid))
+            for oid in cid:
+                oc[oid] += 1
+        fc = defaultdict(int)
+        for oid in oc:
+            fc[feat_of[oid]] += 1
+        obj_count[pat], feat_count[pat], remaining[pat] = oc, fc, len(cliques)
+        if cliques and all(fc[f]/totals[f] >= min_prev for f in pat):
+            prevalent.add(pat)
+    events.sort(key=lambda e: e[0], reverse=True)
+    if stats is not None:
+        t1 = time.perf_counter()
+        stats.add_time("pi", t1 - t0)
+        for pat in prevalent:
+            stats.count(len(pat), "prevalent")
+    ColList = defaultdict(list)
+    e = 0
     for i in range(1, len(Dpair)):
         d = Dpair[i]
         # drop cliques whose diameter > d
-        for pat in list(cliques_by_pat.keys()):
-            cliques_by_pat[pat] = [(cid, dia) for (cid, dia) in cliques_by_pat[pat] if dia <= d]
-        now_prev = _prevalent_at(objects_by_id, patterns_all, cliques_by_pat, min_prev)
-        changed = sorted(set(prev_prev) - set(now_prev))
-        if changed:
-            ColList[Dpair[i-1]].extend(changed)
-        prev_prev = now_prev
+        dropped = []
+        while e < len(events) and events[e][0] > d:
+            _, pat, cid = events[e]
+            e += 1
+            remaining[pat] -= 1
+            if pat not in prevalent:
+                # counters of a non-prevalent pattern no longer matter
+                continue
+            oc, fc = obj_count[pat], feat_count[pat]
+            for oid in cid:
+                oc[oid] -= 1
+                if oc[oid] == 0:
+                    f = feat_of[oid]
+                    fc[f] -= 1
+                    if fc[f]/totals[f] < min_prev:
+                        prevalent.discard(pat)
+                        dropped.append(pat)
+                        break
+            else:
+                if not remaining[pat]:
+                    prevalent.discard(pat)
+                    dropped.append(pat)
+        if dropped:
+            ColList[Dpair[i-1]].extend(dropped)
+    if stats is not None:
+        stats.add_time("events", time.perf_counter() - t1)
     return dict(sorted((k, sorted(v)) for k,v in ColList.items()))
@@ -0,0 +1,85 @@
+"""Neighborhood and clique-instance cache for parameter sweeps.
+
+Instances at distance d are exactly the instances at any D >= d with diameter
+<= d, so one materialization at the largest d2 of a sweep answers every smaller
+d2 and every min_prev by filtering. Entries are keyed by (dataset fingerprint, D)
+and evicted least-recently-used under a byte budget.
+"""
+from collections import OrderedDict
+import hashlib
+
+from .context import DatasetContext
+from .neighbors import build_star_arrays
+from .instances import InstanceTable, size2_tables, join_tables
+from .mining import mine_levels
+
+def dataset_fingerprint(objects) -> str:
+    """Content hash of an object list (ids, features, exact coordinates, order)."""
+    h = hashlib.sha1()
+    for o in objects:
+        h.update(f"{o[0]}\x1f{o[1]}\x1f{o[2]!r}\x1f{o[3]!r}\n".encode())
+    return h.hexdigest()
+
+class MaterializedInstances:
+    """Star neighborhood at dmax plus complete instance tables at dmax, built per pattern on demand."""
+    def __init__(self, ctx: DatasetContext, dmax: float):
+        self.ctx = ctx
+        self.dmax = dmax
+        self.star = build_star_arrays(ctx.xs, ctx.ys, ctx.codes, dmax)
+        # every size-2 table in one pass over the star
+        self.tables = size2_tables(self.star, ctx.codes, dmax)
+
+    def table(self, cand: tuple) -> InstanceTable:
+        t = self.tables.get(cand)
+        if t is None:
+            if len(cand) == 2:
+                t = InstanceTable(2)   # no instance within dmax
+            else:
+                t = join_tables(self.table(cand[:-1]), self.table(cand[:-2] + cand[-1:]),
+                                self.ctx.xs, self.ctx.ys, self.dmax)
+            self.tables[cand] = t
+        return t
+
+    def nbytes(self) -> int:
+        star = sum(len(a) * a.itemsize for a in self.star)
+        return star + sum(t.nbytes() for t in self.tables.values())
+
+class InstanceCache:
+    """LRU cache of MaterializedInstances under a memory budget (bytes of star + tables)."""
+    def __init__(self, max_bytes: int = 512 * 2**20):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()   # (fingerprint, dmax) -> MaterializedInstances
+        self._contexts = {}            # fingerprint -> DatasetContext
+
+    def prepare(self, objects, dmax: float, fingerprint: str = None) -> MaterializedInstances:
+        """Entry able to answer d2 <= dmax; reuses the smallest cached D >= dmax, else builds at dmax.
+        fingerprint: dataset_fingerprint(objects), if already known (callers whose data never
+        changes can compute it once)."""
+        fp = fingerprint or dataset_fingerprint(objects)
+        best = min((key for key in self.entries if key[0] == fp and key[1] >= dmax),
+                   key=lambda key: key[1], default=None)
+        if best is None:
+            ctx = self._contexts.get(fp) or DatasetContext.from_objects(objects)
+            self._contexts[fp] = ctx
+            best = (fp, dmax)
+            self.entries[best] = MaterializedInstances(ctx, dmax)
+        self.entries.move_to_end(best)
+        return self.entries[best]
+
+    def range_comine(self, objects, d1: float, d2: float, min_prev: float, stats=None, fingerprint: str = None):
+        """Same ColList as mining.range_comine, with instances filtered from the cache."""
+        entry = self.prepare(objects, d2, fingerprint)
+        col = mine_levels(entry.ctx, lambda cand, _prev, _bound: entry.table(cand).up_to(d2), d1, min_prev,
+                          stats=stats)
+        self._evict()
+        return col
+
+    def nbytes(self) -> int:
+        return sum(e.nbytes() for e in self.entries.values())
+
+    def _evict(self):
+        # the most recent entry is always kept, even if it alone exceeds the budget
+        while len(self.entries) > 1 and self.nbytes() > self.max_bytes:
+            (fp, _), _ = self.entries.popitem(last=False)
+            if not any(key[0] == fp for key in self.entries):
+                self._contexts.pop(fp, None)
@@ -1,37 +1,220 @@
-
-import argparse, json
+import argparse, asyncio, json, sys
+from contextlib import nullcontext
 from .data import load_objects_csv
-from .synthetic import generate_synthetic
-from .mining import range_comine
+from .store import convert_csv, open_dataset, dataset_objects, is_dataset
+from .synthetic import (generate_synthetic, synthetic_columns, PlantedPattern,
+                        write_synthetic_csv, write_synthetic_dataset)
+from .mining import range_comine, iter_range_comine
+from .partition import range_comine_partitioned
 from .baselines import naive_range, range_inc_mining
+from .index import RangeIndex
+from .approx import range_comine_approx
+from .stats import MiningStats
+from .server import QueryServer
+
+def _write_stats(stats, path):
+    if path == '-':
+        json.dump(stats.to_dict(), sys.stderr, indent=2)
+        sys.stderr.write("\n")
+    else:
+        with open(path, 'w') as f:
+            json.dump(stats.to_dict(), f, indent=2)
+
+def _colist_pairs(colist):
+    for d, pats in colist.items():
+        for p in pats:
+            yield d, p
 
-def main():
-    ap = argparse.ArgumentParser(description="Range–CoMine demo (with baselines)")
+def _write_ndjson(pairs, out, estimates=None):
+    # one {"critical_distance", "pattern"} object per line, written as produced
+    for d, p in pairs:
+        rec = {"critical_distance": d, "pattern": list(p)}
+        if estimates is not None and tuple(p) in estimates:
+            rec["estimate"] = estimates[tuple(p)]._asdict()
+        out.write(json.dumps(rec) + "\n")
+
+def convert_main(argv):
+    ap = argparse.ArgumentParser(prog="range_comine.cli convert",
+                                 description="Convert an id,feature,x,y CSV into a memory-mapped dataset directory")
+    ap.add_argument('csv', type=str, help='Input CSV')
+    ap.add_argument('out', type=str, help='Output dataset directory')
+    ap.add_argument('--sort_cell', type=float, default=0.0, help='Pre-sort rows by grid cell of this size (0 = keep order)')
+    ap.add_argument('--chunk_size', type=int, default=65536)
+    args = ap.parse_args(argv)
+    ds = convert_csv(args.csv, args.out, sort_cell=args.sort_cell or None, chunk_size=args.chunk_size)
+    print(f"Saved: {args.out} ({len(ds)} objects, {len(ds.features)} features)")
+
+def index_main(argv):
+    ap = argparse.ArgumentParser(prog="range_comine.cli index",
+                                 description="Build a range-query index at distance --dmax for later --index queries")
+    ap.add_argument('out', type=str, help='Output index file (.npz)')
     ap.add_argument('--csv', type=str, default='', help='CSV file with id,feature,x,y')
+    ap.add_argument('--data', type=str, default='', help='Dataset directory written by `convert`')
+    ap.add_argument('--dmax', type=float, required=True, help='Largest d2 the index will answer')
+    ap.add_argument('--min_prev_floor', type=float, default=0.0, help='Smallest min_prev the index will answer')
+    args = ap.parse_args(argv)
+    if not (args.csv or args.data):
+        ap.error('Provide --csv or --data')
+    objects = dataset_objects(open_dataset(args.data)) if args.data else load_objects_csv(args.csv)
+    index = RangeIndex.build(objects, args.dmax, args.min_prev_floor)
+    index.save(args.out)
+    print(f"Saved: {args.out} ({len(index.patterns)} patterns, dmax={args.dmax})")
+
+def _planted(spec: str) -> PlantedPattern:
+    feats, count, diameter = spec.split(':')
+    return PlantedPattern(tuple(feats.split(',')), int(count), float(diameter))
+
+def synth_main(argv):
+    ap = argparse.ArgumentParser(prog="range_comine.cli synth",
+                                 description="Generate a large synthetic dataset (dataset directory or CSV), streamed in chunks")
+    ap.add_argument('out', type=str, help='Output dataset directory, or CSV file with --format csv')
+    ap.add_argument('--format', type=str, default='dataset', choices=['dataset', 'csv'])
+    ap.add_argument('--n', type=int, required=True, help='Background objects')
+    ap.add_argument('--features', type=int, default=4)
+    ap.add_argument('--width', type=float, default=1000.0)
+    ap.add_argument('--height', type=float, default=1000.0)
+    ap.add_argument('--zipf', type=float, default=0.0, help='Feature frequency skew (0 = equal)')
+    ap.add_argument('--clusters', type=int, default=0, help='Gaussian clusters of background points (0 = uniform)')
+    ap.add_argument('--cluster_std', type=float, default=None)
+    ap.add_argument('--plant', type=str, action='append', default=[],
+                    help='Planted pattern FEATS:COUNT:DIAMETER, e.g. A,B,C:500:5 (repeatable)')
+    ap.add_argument('--seed', type=int, default=13)
+    ap.add_argument('--chunk_size', type=int, default=1 << 18)
+    ap.add_argument('--truth', type=str, default='', help='Write the planted ground truth (JSON) here')
+    args = ap.parse_args(argv)
+    syn = synthetic_columns(args.n, args.features, args.width, args.height, zipf=args.zipf,
+                            clusters=args.clusters, cluster_std=args.cluster_std,
+                            planted=[_planted(p) for p in args.plant], seed=args.seed, chunk_size=args.chunk_size)
+    (write_synthetic_csv if args.format == 'csv' else write_synthetic_dataset)(args.out, syn)
+    if args.truth:
+        with open(args.truth, 'w') as f:
+            json.dump([t._asdict() for t in syn.truth], f, indent=2)
+    print(f"Saved: {args.out} ({len(syn)} objects, {len(syn.features)} features)")
+
+def serve_main(argv):
+    ap = argparse.ArgumentParser(prog="range_comine.cli serve",
+                                 description="Serve range queries over warm in-memory datasets (HTTP, JSON)")
+    ap.add_argument('--dataset', type=str, action='append', required=True,
+                    help='NAME=PATH of a CSV or a `convert` dataset directory (repeatable)')
+    ap.add_argument('--host', type=str, default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('--unix', type=str, default='', help='Listen on this Unix socket instead of TCP')
+    ap.add_argument('--warm_dmax', type=float, default=0.0, help='Pre-build neighborhoods and size-2 tables at this d2')
+    ap.add_argument('--workers', type=int, default=1, help='Worker processes (forked after warm-up)')
+    ap.add_argument('--cache_mb', type=float, default=512.0, help='Instance-cache budget per dataset (MB)')
+    args = ap.parse_args(argv)
+    datasets = {}
+    for spec in args.dataset:
+        name, sep, path = spec.partition('=')
+        if not sep:
+            ap.error(f'--dataset {spec!r}: expected NAME=PATH')
+        datasets[name] = dataset_objects(open_dataset(path)) if is_dataset(path) else load_objects_csv(path)
+    server = QueryServer(datasets, warm_dmax=args.warm_dmax or None, workers=args.workers, cache_mb=args.cache_mb)
+
+    async def run():
+        srv = await server.start(args.host, args.port, args.unix or None)
+        print(f"Serving {', '.join(datasets)} on {args.unix or f'http://{args.host}:{args.port}'}", flush=True)
+        try:
+            await srv.serve_forever()
+        finally:
+            await server.close()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'convert':
+        return convert_main(argv[1:])
+    if argv and argv[0] == 'index':
+        return index_main(argv[1:])
+    if argv and argv[0] == 'synth':
+        return synth_main(argv[1:])
+    if argv and argv[0] == 'serve':
+        return serve_main(argv[1:])
+    ap = argparse.ArgumentParser(description="Range–CoMine demo (with baselines); `convert` / `index` / `synth` / `serve` subcommands build datasets, query indexes and serve queries")
+    ap.add_argument('--csv', type=str, default='', help='CSV file with id,feature,x,y')
+    ap.add_argument('--data', type=str, default='', help='Dataset directory written by `convert` (memory-mapped)')
+    ap.add_argument('--index', type=str, default='', help='Answer the query from an index built by `index`')
     ap.add_argument('--synthetic', action='store_true', help='Use synthetic data')
     ap.add_argument('--features', type=int, default=4)
     ap.add_argument('--instances', type=int, default=8)
     ap.add_argument('--d1', type=float, default=10.0)
     ap.add_argument('--d2', type=float, default=30.0)
     ap.add_argument('--min_prev', type=float, default=0.5)
-    ap.add_argument('--algo', type=str, default='range_comine', choices=['range_comine','naive','range_inc'])
-    args = ap.parse_args()
+    ap.add_argument('--algo', type=str, default='range_comine', choices=['range_comine','naive','range_inc','approx'])
+    ap.add_argument('--workers', type=int, default=1, help='Processes per level for range_comine')
+    ap.add_argument('--tile_size', type=float, default=0.0, help='Mine range_comine over spatial tiles of this size, run on --workers processes (0 = off)')
+    ap.add_argument('--sample_fraction', type=float, default=0.1, help='Per-feature sample fraction for --algo approx')
+    ap.add_argument('--verify', action='store_true', help='With --algo approx, re-check borderline patterns exactly')
+    ap.add_argument('--max_size', type=int, default=None, help='range_comine: only patterns up to this size')
+    ap.add_argument('--top_k', type=int, default=None,
+                    help='range_comine: only the k patterns (size >= 2) with the smallest critical distance')
+    ap.add_argument('--stats', type=str, default='', help="Write phase times and level counters (JSON) here ('-' = stderr)")
+    ap.add_argument('--output', type=str, default='json', choices=['json', 'ndjson'],
+                    help='json: one ColList document; ndjson: one line per pattern, streamed as mined')
+    ap.add_argument('--out', type=str, default='-', help="Output file ('-' = stdout)")
+    args = ap.parse_args(argv)
+    with (nullcontext(sys.stdout) if args.out == '-' else open(args.out, 'w')) as out:
+        _run(ap, args, out)
+
+def _run(ap, args, out):
+    if args.index:
+        result = RangeIndex.load(args.index).query(args.d1, args.d2, args.min_prev)
+        if args.output == 'ndjson':
+            _write_ndjson(_colist_pairs(result), out)
+        else:
+            json.dump(result, out, indent=2, sort_keys=True)
+            out.write("\n")
+        return
 
     if args.synthetic:
         objects = generate_synthetic(n_features=args.features, instances_per_feat=args.instances)
+    elif args.data:
+        objects = dataset_objects(open_dataset(args.data))
     else:
         if not args.csv:
-            ap.error('Provide --csv or use --synthetic')
+            ap.error('Provide --csv, --data or use --synthetic')
         objects = load_objects_csv(args.csv)
 
-    if args.algo == 'range_comine':
-        result = range_comine(objects, args.d1, args.d2, args.min_prev)
+    if (args.max_size or args.top_k) and (args.algo != 'range_comine' or args.tile_size > 0):
+        ap.error('--max_size / --top_k need --algo range_comine (untiled)')
+    if args.stats and (args.algo == 'approx' or args.tile_size > 0):
+        ap.error('--stats needs --algo range_comine (untiled), naive or range_inc')
+    stats = MiningStats() if args.stats else None
+    estimates = None
+    if args.algo == 'range_comine' and args.tile_size == 0 and args.output == 'ndjson' and not args.top_k:
+        # streamed: nothing but the current and previous level is held
+        _write_ndjson(iter_range_comine(objects, args.d1, args.d2, args.min_prev, workers=args.workers,
+                                        stats=stats, max_size=args.max_size), out)
+        result = None
+    elif args.algo == 'range_comine' and args.tile_size > 0:
+        result = range_comine_partitioned(objects, args.d1, args.d2, args.min_prev,
+                                          tile_size=args.tile_size, workers=args.workers)
+    elif args.algo == 'range_comine':
+        result = range_comine(objects, args.d1, args.d2, args.min_prev, workers=args.workers, stats=stats,
+                              max_size=args.max_size, top_k=args.top_k)
+    elif args.algo == 'approx':
+        res = range_comine_approx(objects, args.d1, args.d2, args.min_prev,
+                                  fraction=args.sample_fraction, verify=args.verify)
+        result = {"colist": res.colist,
+                  "estimates": {"+".join(p): e._asdict() for p, e in res.patterns.items()}}
+        estimates = res.patterns
     elif args.algo == 'naive':
-        result = naive_range(objects, args.d1, args.d2, args.min_prev)
+        result = naive_range(objects, args.d1, args.d2, args.min_prev, stats=stats)
     else:
-        result = range_inc_mining(objects, args.d1, args.d2, args.min_prev)
+        result = range_inc_mining(objects, args.d1, args.d2, args.min_prev, stats=stats)
 
-    print(json.dumps(result, indent=2, sort_keys=True))
+    if result is None:
+        pass
+    elif args.output == 'ndjson':
+        _write_ndjson(_colist_pairs(result["colist"] if args.algo == 'approx' else result), out, estimates)
+    else:
+        json.dump(result, out, indent=2, sort_keys=True)
+        out.write("\n")
+    if stats is not None:
+        _write_stats(stats, args.stats)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,44 @@
+from typing import Dict, List
+from array import array
+
+class DatasetContext:
+    """
+    Per-run dataset summary, built once and shared by every PI computation.
+      features: deterministic feature order (sorted by name)
+      feature_totals: feature -> number of instances in the dataset
+      feature_of: object id -> feature
+      ids_by_feature: feature -> object ids of that feature (input order)
+      ids / index: interned object ids (int -> id, id -> int)
+    Interned columns, indexed by object int:
+      codes: array('i') feature codes (position in `features`)
+      xs, ys: array('d') coordinates
+      totals: per-code instance counts (list)
+    """
+    def __init__(self, objects_by_id: Dict[str, tuple]):
+        self.objects_by_id = objects_by_id
+        self.features: List[str] = sorted({o[1] for o in objects_by_id.values()})
+        self.ids: List[str] = list(objects_by_id)
+        self.index: Dict[str, int] = {oid:i for i,oid in enumerate(self.ids)}
+        self.feature_of: Dict[str, str] = {oid: o[1] for oid,o in objects_by_id.items()}
+        self.ids_by_feature: Dict[str, List[str]] = {f:[] for f in self.features}
+        for oid, f in self.feature_of.items():
+            self.ids_by_feature[f].append(oid)
+        self.feature_totals: Dict[str, int] = {f: len(v) for f,v in self.ids_by_feature.items()}
+        self.feature_code: Dict[str, int] = {f:i for i,f in enumerate(self.features)}
+        objs = objects_by_id.values()
+        self.codes = array('i', (self.feature_code[o[1]] for o in objs))
+        self.xs = array('d', (o[2] for o in objs))
+        self.ys = array('d', (o[3] for o in objs))
+        self.totals: List[int] = [self.feature_totals[f] for f in self.features]
+
+    @classmethod
+    def from_objects(cls, objects) -> "DatasetContext":
+        return cls({o[0]: o for o in objects})
+
+    def pattern_names(self, pattern) -> tuple:
+        """Feature codes -> feature names (API boundary)."""
+        return tuple(self.features[c] for c in pattern)
+
+def ensure_context(objects_by_id: Dict[str, tuple], ctx: "DatasetContext" = None) -> DatasetContext:
+    """Return `ctx` if given, else build one (for callers outside a mining run)."""
+    return ctx if ctx is not None else DatasetContext(objects_by_id)
@@ -1,15 +1,69 @@
-
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterator, NamedTuple
+from array import array
+import itertools
 
 # Object record: (id, feature, x, y)
 Obj = Tuple[str, str, float, float]
 
+class ColumnChunk(NamedTuple):
+    """A block of objects as typed columns; codes index the loader's feature dictionary."""
+    ids: List[str]
+    codes: array   # 'i'
+    xs: array      # 'd'
+    ys: array      # 'd'
+
+def iter_csv_chunks(path: str, chunk_size: int = 65536,
+                    feature_codes: Dict[str, int] = None) -> Iterator[ColumnChunk]:
+    """
+    Stream a CSV with header id,feature,x,y as ColumnChunks of up to chunk_size rows.
+    Features are interned in order of first appearance into `feature_codes`
+    (pass a dict to share or inspect it; it is updated as chunks are read).
+    """
+    import csv
+    codes_of = feature_codes if feature_codes is not None else {}
+    with open(path, newline='') as f:
+        # blank lines come back as [] and are skipped; an empty file yields nothing
+        reader = filter(None, csv.reader(f))
+        header = next(reader, None)
+        if header is None:
+            return
+        i_id, i_f, i_x, i_y = (header.index(c) for c in ('id', 'feature', 'x', 'y'))
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                break
+            feats = [row[i_f] for row in rows]
+            for name in dict.fromkeys(feats):
+                if name not in codes_of:
+                    codes_of[name] = len(codes_of)
+            yield ColumnChunk([row[i_id] for row in rows], array('i', map(codes_of.__getitem__, feats)),
+                              array('d', [float(row[i_x]) for row in rows]),
+                              array('d', [float(row[i_y]) for row in rows]))
+
+def load_columns_csv(path: str, chunk_size: int = 65536):
+    """
+    Load a CSV into columns (ids, codes, xs, ys, features) without per-row dicts or tuples.
+    Codes are renumbered to sorted-feature order, as in DatasetContext.
+    """
+    feature_codes: Dict[str, int] = {}
+    ids: List[str] = []
+    codes, xs, ys = array('i'), array('d'), array('d')
+    for chunk in iter_csv_chunks(path, chunk_size, feature_codes):
+        ids.extend(chunk.ids)
+        codes.extend(chunk.codes)
+        xs.extend(chunk.xs)
+        ys.extend(chunk.ys)
+    features = sorted(feature_codes)
+    remap = [0] * len(feature_codes)
+    for new, f in enumerate(features):
+        remap[feature_codes[f]] = new
+    return ids, array('i', (remap[c] for c in codes)), xs, ys, features
+
 def load_objects_csv(path: str) -> List[Obj]:
     """Load spatial objects from a CSV with header: id,feature,x,y"""
     out: List[Obj] = []
-    import csv
-    with open(path, newline='') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            out.append((row['id'], row['feature'], float(row['x']), float(row['y'])))
+    feature_codes: Dict[str, int] = {}
+    for chunk in iter_csv_chunks(path, feature_codes=feature_codes):
+        names = list(feature_codes)
+        out.extend(zip(chunk.ids, (names[c] for c in chunk.codes), chunk.xs, chunk.ys))
     return out
@@ -0,0 +1,203 @@
+"""Incremental Range–CoMine under object inserts and deletes.
+
+`IncrementalMiner` keeps, for fixed (d1, d2, min_prev), a grid over the live
+objects, the instance table of every current candidate pattern and the last
+evaluation of each candidate. An update
+  - drops the instances containing removed objects,
+  - finds the new star edges of inserted objects and propagates them level by
+    level as delta joins: new instances of p ∪ q are join(Δp, q) ∪ join(p, Δq),
+  - re-evaluates only candidates whose table, CDMP bound or feature totals
+    changed, and builds/drops tables for candidates that appear or disappear
+    as patterns cross min_prev (Apriori growth and shrinkage).
+`colist()` always equals `range_comine` over the current objects.
+"""
+from typing import Dict, List
+from array import array
+import itertools, math
+
+from .data import Obj
+from .neighbors import cell_of
+from .instances import InstanceTable, join_tables, first_participation
+from .metrics import pi_from_participants, critical_distance_sweep
+from .mining import candidate_join
+
+def _concat(a: InstanceTable, b: InstanceTable) -> InstanceTable:
+    return InstanceTable(a.k, a.rows + b.rows, a.dias + b.dias)
+
+def _without(table: InstanceTable, removed) -> InstanceTable:
+    """Instances of `table` containing none of the `removed` object ints."""
+    k, rows = table.k, table.rows
+    out = InstanceTable(k)
+    for i, dia in enumerate(table.dias):
+        row = rows[i*k:(i+1)*k]
+        if not any(o in removed for o in row):
+            out.rows.extend(row)
+            out.dias.append(dia)
+    return out
+
+class IncrementalMiner:
+    """
+    Range–CoMine for fixed (d1, d2, min_prev), maintained under add_objects/remove_objects.
+    Patterns are sorted tuples of feature names; instance rows hold object ints
+    in the pattern's feature order.
+    """
+    def __init__(self, d1: float, d2: float, min_prev: float, objects: List[Obj] = ()):
+        self.d1, self.d2, self.min_prev = d1, d2, min_prev
+        self.index: Dict[str, int] = {}          # live object id -> int
+        self.ids: List[str] = []
+        self.feature_of: List[str] = []
+        self.xs, self.ys = array('d'), array('d')
+        self.totals: Dict[str, int] = {}
+        self.grid: Dict[tuple, set] = {}
+        self.tables: Dict[tuple, InstanceTable] = {}   # every current candidate with k >= 2
+        self.evaluated: Dict[tuple, tuple] = {}       # cand -> (min_allowed, critical distance or None)
+        self.critical: Dict[tuple, float] = {}        # prevalent patterns, k >= 2
+        if objects:
+            self.add_objects(objects)
+
+    def features(self) -> List[str]:
+        return sorted(f for f, n in self.totals.items() if n)
+
+    def add_objects(self, objects: List[Obj]):
+        objects = list(objects)
+        seen = set()
+        for o in objects:
+            if o[0] in self.index or o[0] in seen:
+                raise ValueError(f"object {o[0]!r} is already present")
+            seen.add(o[0])
+        new = []
+        for oid, f, x, y in objects:
+            i = len(self.ids)
+            self.index[oid] = i
+            self.ids.append(oid); self.feature_of.append(f)
+            self.xs.append(x); self.ys.append(y)
+            self.totals[f] = self.totals.get(f, 0) + 1
+            self.grid.setdefault(cell_of(x, y, self._cell()), set()).add(i)
+            new.append(i)
+        self._update(set(), new, {o[1] for o in objects})
+
+    def remove_objects(self, ids: List[str]):
+        ids = list(ids)
+        seen = set()
+        for oid in ids:
+            if oid not in self.index or oid in seen:
+                raise ValueError(f"object {oid!r} is not present")
+            seen.add(oid)
+        removed = set()
+        changed = set()
+        for oid in ids:
+            i = self.index.pop(oid)
+            f = self.feature_of[i]
+            self.totals[f] -= 1
+            changed.add(f)
+            self.grid[cell_of(self.xs[i], self.ys[i], self._cell())].discard(i)
+            removed.add(i)
+        self._update(removed, [], changed)
+
+    def colist(self):
+        ColList = {}
+        for f in self.features():
+            ColList.setdefault(self.d1, []).append((f,))
+        for p, cr in self.critical.items():
+            ColList.setdefault(cr, []).append(p)
+        return dict(sorted((d, sorted(v)) for d, v in ColList.items()))
+
+    def _cell(self) -> float:
+        return self.d2 if self.d2 > 0 else 1.0
+
+    def _new_pairs(self, new: List[int]) -> Dict[tuple, InstanceTable]:
+        """Size-2 instances with at least one inserted object, by pattern."""
+        xs, ys, feat, d2 = self.xs, self.ys, self.feature_of, self.d2
+        is_new = set(new)
+        out: Dict[tuple, InstanceTable] = {}
+        for a in new:
+            cx, cy = cell_of(xs[a], ys[a], self._cell())
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for b in self.grid.get((cx + dx, cy + dy), ()):
+                        if feat[b] == feat[a] or (b in is_new and b < a):
+                            continue
+                        d = math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+                        if d > d2:
+                            continue
+                        row = (a, b) if feat[a] < feat[b] else (b, a)
+                        out.setdefault((feat[row[0]], feat[row[1]]), InstanceTable(2)).append(row, d)
+        return out
+
+    def _update(self, removed, new: List[int], changed_features):
+        # 1. bring every maintained table up to date; remember which changed
+        dirty = set()
+        if removed:
+            for cand, table in self.tables.items():
+                kept = _without(table, removed)
+                if len(kept) != len(table):
+                    self.tables[cand] = kept
+                    dirty.add(cand)
+        if new:
+            for f1, f2 in itertools.combinations(self.features(), 2):
+                self.tables.setdefault((f1, f2), InstanceTable(2))
+            deltas = self._new_pairs(new)
+            by_k = sorted(self.tables, key=len)
+            for cand in by_k:
+                if len(cand) < 3:
+                    continue
+                p, q = cand[:-1], cand[:-2] + cand[-1:]
+                dp, dq = deltas.get(p), deltas.get(q)
+                tp, tq = self.tables[p], self.tables[q]
+                delta = InstanceTable(len(cand))
+                if dp is not None:
+                    delta = _concat(delta, join_tables(dp, tq, self.xs, self.ys, self.d2))
+                    if dq is not None:
+                        delta = _concat(delta, join_tables(dp, dq, self.xs, self.ys, self.d2))
+                if dq is not None:
+                    delta = _concat(delta, join_tables(tp, dq, self.xs, self.ys, self.d2))
+                if len(delta):
+                    deltas[cand] = delta
+            for cand, delta in deltas.items():
+                self.tables[cand] = _concat(self.tables[cand], delta)
+                dirty.add(cand)
+        # 2. level-wise re-evaluation; candidate sets follow the prevalent patterns
+        features = self.features()
+        for cand in [c for c in self.tables if len(c) == 2 and not set(c) <= set(features)]:
+            del self.tables[cand]
+        critical = {(f,): self.d1 for f in features}
+        P_prev = [(f,) for f in features]
+        k = 2
+        while P_prev:
+            Ck = candidate_join(P_prev) if k>2 else list(itertools.combinations(features, 2))
+            Pk = []
+            for cand in Ck:
+                if cand not in self.tables:
+                    self.tables[cand] = join_tables(self.tables[cand[:-1]], self.tables[cand[:-2] + cand[-1:]],
+                                                    self.xs, self.ys, self.d2)
+                    dirty.add(cand)
+                if k == 2:
+                    min_allowed = -math.inf
+                else:
+                    min_allowed = max(critical[s] for s in itertools.combinations(cand, k-1))
+                prev = self.evaluated.get(cand)
+                if (cand in dirty or prev is None or prev[0] != min_allowed
+                        or not changed_features.isdisjoint(cand)):
+                    prev = self.evaluated[cand] = (min_allowed, self._critical(cand, min_allowed))
+                if prev[1] is not None:
+                    Pk.append(cand)
+                    critical[cand] = prev[1]
+            # candidates no longer generated lose their tables and evaluations
+            for cand in [c for c in self.tables if len(c) == k and c not in set(Ck)]:
+                del self.tables[cand]
+                self.evaluated.pop(cand, None)
+            P_prev = Pk
+            k += 1
+        for cand in [c for c in self.tables if len(c) >= k]:
+            del self.tables[cand]
+            self.evaluated.pop(cand, None)
+        self.critical = {p: d for p, d in critical.items() if len(p) > 1}
+
+    def _critical(self, cand, min_allowed):
+        """Same evaluation as range_comine: PI at d2 over instances >= min_allowed, then the sweep."""
+        table = self.tables[cand]
+        first = first_participation(table, min_allowed)
+        if not first or pi_from_participants(first, self.feature_of, self.totals) < self.min_prev:
+            return None
+        return critical_distance_sweep(first, self.feature_of, self.totals, self.min_prev, self.d1,
+                                       (dia for dia in table.dias if dia >= min_allowed))
@@ -0,0 +1,190 @@
+"""Precomputed range-query index.
+
+Built once at a maximum distance D, it answers any (d1, d2 <= D, min_prev)
+query with the same ColList as `range_comine`, without enumerating cliques.
+
+Per indexed pattern it stores
+  - the PI-versus-distance step function (PI only changes at first-participation
+    distances): distances and the PI reached there;
+  - the distinct (diameter, object) participations, sorted by diameter.
+
+Size-2 patterns are answered from the step function by binary search. For
+k >= 3, range_comine only counts instances with diameter >= the largest critical
+distance of the subpatterns (CDMP); those queries binary-search that bound and
+scan participations upward until PI reaches min_prev, after the step function
+has rejected patterns whose unrestricted PI at d2 is already too low.
+
+Only patterns whose PI at D is >= `min_prev_floor` are indexed (PI at D bounds
+PI for every d2 <= D), so queries need min_prev >= min_prev_floor.
+"""
+from typing import List
+from collections import defaultdict
+import itertools, json, math
+import numpy as np
+
+from .context import DatasetContext
+from .neighbors import build_star_arrays
+from .instances import InstanceTable, size2_tables, join_tables, first_participation
+from .metrics import pi_from_participants
+from .mining import candidate_join
+
+class RangeIndex:
+    def __init__(self, features: List[str], totals: List[int], codes, dmax: float, min_prev_floor: float,
+                 patterns, step_off, step_d, step_pi, part_off, part_d, part_o):
+        self.features = list(features)
+        self.totals = list(totals)
+        self.codes = codes
+        self.dmax = dmax
+        self.min_prev_floor = min_prev_floor
+        self.patterns = [tuple(p) for p in patterns]
+        self._pos = {p: i for i, p in enumerate(self.patterns)}
+        self.step_off, self.step_d, self.step_pi = step_off, step_d, step_pi
+        self.part_off, self.part_d, self.part_o = part_off, part_d, part_o
+
+    @classmethod
+    def build(cls, objects, dmax: float, min_prev_floor: float = 0.0) -> "RangeIndex":
+        """Mine every pattern with PI >= min_prev_floor at dmax and record its PI data."""
+        ctx = DatasetContext.from_objects(objects)
+        codes, totals = ctx.codes, ctx.totals
+        star = build_star_arrays(ctx.xs, ctx.ys, codes, dmax)
+        F = len(ctx.features)
+        patterns = []
+        step_off, step_d, step_pi = [0], [], []
+        part_off, part_d, part_o = [0], [], []
+        pairs = size2_tables(star, codes, dmax)
+        P_prev = [(c,) for c in range(F)]
+        tables_prev = {}
+        k = 2
+        while P_prev:
+            Ck = candidate_join(P_prev) if k>2 else list(itertools.combinations(range(F), 2))
+            Pk, tables_k = [], {}
+            for cand in Ck:
+                if k == 2:
+                    table = pairs.get(cand, InstanceTable(2))
+                else:
+                    table = join_tables(tables_prev[cand[:-1]], tables_prev[cand[:-2] + cand[-1:]], ctx.xs, ctx.ys, dmax)
+                first = first_participation(table)
+                if not first or pi_from_participants(first, codes, totals) < min_prev_floor:
+                    continue
+                Pk.append(cand)
+                tables_k[cand] = table
+                patterns.append(cand)
+                # step function: PI after all objects up to each first-participation distance
+                count = {c: 0 for c in cand}
+                last = -1.0
+                events = sorted(first.items(), key=lambda kv: kv[1])
+                for j, (o, d) in enumerate(events):
+                    count[codes[o]] += 1
+                    if j + 1 < len(events) and events[j + 1][1] == d:
+                        continue
+                    pi = min(count[c] / totals[c] for c in cand)
+                    if pi > last:
+                        step_d.append(d); step_pi.append(pi); last = pi
+                step_off.append(len(step_d))
+                parts = sorted({(dia, o) for row, dia in table for o in row})
+                part_d.extend(d for d, _ in parts)
+                part_o.extend(o for _, o in parts)
+                part_off.append(len(part_d))
+            P_prev, tables_prev = Pk, tables_k
+            k += 1
+        return cls(ctx.features, totals, np.asarray(codes, dtype=np.int32), dmax, min_prev_floor, patterns,
+                   np.asarray(step_off, dtype=np.int64), np.asarray(step_d, dtype=np.float64),
+                   np.asarray(step_pi, dtype=np.float64), np.asarray(part_off, dtype=np.int64),
+                   np.asarray(part_d, dtype=np.float64), np.asarray(part_o, dtype=np.int32))
+
+    def save(self, path: str):
+        meta = {"features": self.features, "totals": self.totals, "dmax": self.dmax,
+                "min_prev_floor": self.min_prev_floor, "patterns": [list(p) for p in self.patterns]}
+        with open(path, "wb") as f:
+            np.savez(f, meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8), codes=self.codes,
+                     step_off=self.step_off, step_d=self.step_d, step_pi=self.step_pi,
+                     part_off=self.part_off, part_d=self.part_d, part_o=self.part_o)
+
+    @classmethod
+    def load(cls, path: str) -> "RangeIndex":
+        z = np.load(path)
+        meta = json.loads(z["meta"].tobytes().decode())
+        return cls(meta["features"], meta["totals"], z["codes"], meta["dmax"], meta["min_prev_floor"],
+                   meta["patterns"], z["step_off"], z["step_d"], z["step_pi"],
+                   z["part_off"], z["part_d"], z["part_o"])
+
+    def query(self, d1: float, d2: float, min_prev: float):
+        """ColList of range_comine(objects, d1, d2, min_prev), answered from the index."""
+        if d2 > self.dmax:
+            raise ValueError(f"d2={d2} exceeds the index distance {self.dmax}")
+        if min_prev < self.min_prev_floor:
+            raise ValueError(f"min_prev={min_prev} is below the index floor {self.min_prev_floor}")
+        F = len(self.features)
+        ColList = defaultdict(list)
+        for c in range(F):
+            ColList[d1].append((c,))
+        critical = { (c,): d1 for c in range(F) }
+        P_prev = [(c,) for c in range(F)]
+        k = 2
+        while P_prev:
+            Ck = candidate_join(P_prev) if k>2 else list(itertools.combinations(range(F), 2))
+            Pk = []
+            for cand in Ck:
+                i = self._pos.get(cand)
+                if i is None:
+                    continue
+                if k == 2:
+                    min_allowed = -math.inf
+                else:
+                    min_allowed = max(critical[tuple(sorted(s))] for s in itertools.combinations(cand, k-1))
+                cr = self._critical(i, cand, min_allowed, d1, d2, min_prev)
+                if cr is None:
+                    continue
+                Pk.append(cand)
+                critical[cand] = cr
+                ColList[cr].append(cand)
+            P_prev = Pk
+            k += 1
+        names = self.features
+        return dict(sorted((d, sorted(tuple(names[c] for c in p) for p in v)) for d,v in ColList.items()))
+
+    def _critical(self, i, cand, min_allowed, d1, d2, min_prev):
+        """Critical distance of pattern i over instances with min_allowed <= diameter <= d2, or None."""
+        p0, p1 = int(self.part_off[i]), int(self.part_off[i + 1])
+        part_d = self.part_d
+        lo = p0 + int(np.searchsorted(part_d[p0:p1], min_allowed, side="left"))
+        hi = p0 + int(np.searchsorted(part_d[p0:p1], d2, side="right"))
+        if lo >= hi:
+            return None   # no instance in [min_allowed, d2]
+        if min_prev > 0:
+            s0, s1 = int(self.step_off[i]), int(self.step_off[i + 1])
+            sd, sp = self.step_d[s0:s1], self.step_pi[s0:s1]
+            j = int(np.searchsorted(sd, d2, side="right")) - 1
+            if j < 0 or sp[j] < min_prev:
+                return None   # even unrestricted PI at d2 is too low
+            if min_allowed == -math.inf:
+                reached = float(sd[int(np.searchsorted(sp, min_prev, side="left"))])
+            else:
+                reached = self._scan(cand, lo, hi, min_prev)
+                if reached is None:
+                    return None
+        else:
+            reached = -math.inf
+        if reached >= d1:
+            return reached
+        # PI already reached below d1: first instance diameter >= d1
+        j = p0 + int(np.searchsorted(part_d[p0:p1], max(d1, min_allowed), side="left"))
+        return float(part_d[j]) if j < hi else None
+
+    def _scan(self, cand, lo, hi, min_prev):
+        """Distance where PI over participations part[lo:hi] first reaches min_prev (ascending sweep)."""
+        codes, totals = self.codes, self.totals
+        count = {c: 0 for c in cand}
+        below = len(cand)
+        seen = set()
+        for d, o in zip(self.part_d[lo:hi].tolist(), self.part_o[lo:hi].tolist()):
+            if o in seen:
+                continue
+            seen.add(o)
+            c = int(codes[o])
+            count[c] += 1
+            if (count[c] - 1) / totals[c] < min_prev <= count[c] / totals[c]:
+                below -= 1
+                if not below:
+                    return d
+        return None
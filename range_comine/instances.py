@@ -0,0 +1,180 @@
+from typing import Dict, Tuple
+from array import array
+import math
+from .neighbors import StarCSR
+
+class InstanceTable:
+    """
+    Clique instances of one k-pattern as fixed-width int rows.
+      rows: array('i'), k interned object ids per instance, in feature-code order
+      dias: array('d'), one diameter per instance
+    """
+    __slots__ = ("k", "rows", "dias")
+
+    def __init__(self, k: int, rows: array = None, dias: array = None):
+        self.k = k
+        self.rows = rows if rows is not None else array('i')
+        self.dias = dias if dias is not None else array('d')
+
+    def __len__(self) -> int:
+        return len(self.dias)
+
+    def append(self, row, dia: float):
+        self.rows.extend(row)
+        self.dias.append(dia)
+
+    def row(self, i: int) -> Tuple[int, ...]:
+        k = self.k
+        return tuple(self.rows[i*k:(i+1)*k])
+
+    def up_to(self, dmax: float) -> "InstanceTable":
+        """Instances with diameter <= dmax (the instance set at distance dmax)."""
+        if all(dia <= dmax for dia in self.dias):
+            return self
+        k, rows = self.k, self.rows
+        out = InstanceTable(k)
+        for i, dia in enumerate(self.dias):
+            if dia <= dmax:
+                out.rows.extend(rows[i*k:(i+1)*k])
+                out.dias.append(dia)
+        return out
+
+    def nbytes(self) -> int:
+        return len(self.rows) * self.rows.itemsize + len(self.dias) * self.dias.itemsize
+
+    def __iter__(self):
+        k, rows = self.k, self.rows
+        for i, dia in enumerate(self.dias):
+            yield tuple(rows[i*k:(i+1)*k]), dia
+
+class ParticipationBound:
+    """
+    Early-abort prevalence check for one candidate while join_tables enumerates its
+    instances. Instances are produced grouped by an anchor object of one feature,
+    the last object of the p row. Once its group is done an anchor has either
+    participated (in an instance with diameter >= min_dia) or never will, so that
+    feature's reachable participation is found + anchors left. Enumeration stops once it falls below min_prev; once `found` alone
+    reaches min_prev the feature can no longer fail and checking stops.
+    """
+    __slots__ = ("totals", "min_prev", "min_dia", "total", "found", "left", "active")
+
+    def __init__(self, totals, min_prev: float, min_dia: float = -math.inf):
+        self.totals = totals
+        self.min_prev, self.min_dia = min_prev, min_dia
+        self.total = self.found = self.left = 0
+        self.active = False
+
+    def start(self, code: int, anchors: int) -> bool:
+        """Anchors of feature `code` to visit; False if the candidate is already hopeless."""
+        self.total, self.found, self.left = self.totals[code], 0, anchors
+        self.active = self.min_prev > 0
+        return not self.active or anchors / self.total >= self.min_prev
+
+    def done(self, participated: bool) -> bool:
+        """One anchor group finished; True if the candidate can no longer be prevalent."""
+        if not self.active:
+            return False
+        self.left -= 1
+        if participated:
+            self.found += 1
+            if self.found / self.total >= self.min_prev:
+                self.active = False
+            return False
+        return (self.found + self.left) / self.total < self.min_prev
+
+def size2_table(cand: Tuple[int, int], star: StarCSR, codes, dmax: float) -> InstanceTable:
+    """Size-2 instances of feature codes c1 < c2: star edges from a c2 center to a c1 neighbor.
+    A full star pass per pair, kept as the reference for `size2_tables`."""
+    c1, c2 = cand
+    offsets, indices, dists = star
+    table = InstanceTable(2)
+    for i in range(len(codes)):
+        if codes[i] != c2:
+            continue
+        for p in range(offsets[i], offsets[i+1]):
+            j = indices[p]
+            if codes[j] == c1 and dists[p] <= dmax:
+                table.append((j, i), dists[p])
+    return table
+
+def size2_tables(star: StarCSR, codes, dmax: float) -> Dict[Tuple[int, int], InstanceTable]:
+    """Size-2 instances of every feature pair in one pass over the star edges.
+    Stars only hold neighbors of feature code <= the center's, so the edge from center i
+    to a neighbor j of another feature is an instance of (codes[j], codes[i]).
+    Rows per pair come out in the same order as `size2_table`."""
+    offsets, indices, dists = star
+    tables: Dict[Tuple[int, int], InstanceTable] = {}
+    for i in range(len(codes)):
+        c2 = codes[i]
+        for p in range(offsets[i], offsets[i+1]):
+            j = indices[p]
+            c1 = codes[j]
+            if c1 == c2 or dists[p] > dmax:
+                continue
+            table = tables.get((c1, c2))
+            if table is None:
+                table = tables[(c1, c2)] = InstanceTable(2)
+            table.rows.append(j); table.rows.append(i)
+            table.dias.append(dists[p])
+    return tables
+
+def join_tables(table_p: InstanceTable, table_q: InstanceTable, xs, ys, dmax: float,
+                bound: ParticipationBound = None, codes=None) -> InstanceTable:
+    """
+    Build k-instances of cand = p ∪ q from two (k-1)-instance tables.
+    p = cand[:-1] and q = cand[:-2] + cand[-1:] share the (k-2)-prefix. Two rows
+    join when their prefixes agree and their last objects are within dmax; the
+    only pair not covered by either parent is that last edge, so
+    diameter = max(dia_p, dia_q, edge).
+    With a bound (and `codes`), p rows are visited grouped by their last object,
+    the anchor, and None is returned once cand cannot be prevalent.
+    """
+    by_prefix: Dict[tuple, list] = {}
+    for row, dia in table_q:
+        by_prefix.setdefault(row[:-1], []).append((row[-1], dia))
+    k = table_p.k
+    order = range(len(table_p))
+    if bound is not None and len(table_p):
+        last = table_p.rows[k-1::k]
+        order = sorted(order, key=last.__getitem__)
+        if not bound.start(codes[last[0]], len(set(last))):
+            return None
+    out = InstanceTable(k + 1)
+    rows, dias = table_p.rows, table_p.dias
+    anchor, participated = None, False
+    for i in order:
+        row, dia_p = tuple(rows[i*k:(i+1)*k]), dias[i]
+        a = row[-1]
+        if a != anchor:
+            if anchor is not None and bound is not None and bound.done(participated):
+                return None
+            anchor, participated = a, False
+        tails = by_prefix.get(row[:-1])
+        if not tails:
+            continue
+        xa, ya = xs[a], ys[a]
+        for b, dia_q in tails:
+            edge = math.hypot(xa - xs[b], ya - ys[b])
+            if edge > dmax:
+                continue
+            dia = dia_p if dia_p > dia_q else dia_q
+            dia = edge if edge > dia else dia
+            out.append(row + (b,), dia)
+            if bound is not None and dia >= bound.min_dia:
+                participated = True
+    if anchor is not None and bound is not None and bound.done(participated):
+        return None
+    return out
+
+def first_participation(table: InstanceTable, min_dia: float = -math.inf) -> Dict[int, float]:
+    """object -> smallest diameter of an instance containing it, over instances with diameter >= min_dia."""
+    first: Dict[int, float] = {}
+    k, rows = table.k, table.rows
+    for i, dia in enumerate(table.dias):
+        if dia < min_dia:
+            continue
+        for o in rows[i*k:(i+1)*k]:
+            d = first.get(o)
+            if d is None or dia < d:
+                first[o] = dia
+    return first
@@ -1,30 +1,67 @@
-
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Tuple, Set, Iterable
+import math
+from .context import DatasetContext, ensure_context
 
 def participation_index(cliques: List[Tuple[Tuple[str,...], float]],
-                        objects_by_id: Dict[str, tuple]) -> float:
+                        objects_by_id: Dict[str, tuple],
+                        ctx: DatasetContext = None) -> float:
     """
     PI = min_f (#distinct instances of f in any clique) / (total instances of f)
     cliques: list of (tuple of object ids in clique), diameter
+    ctx: shared DatasetContext for feature totals; built from objects_by_id if omitted
     """
     if not cliques:
         return 0.0
-    # collect features per object id
-    feat_of = {oid: objects_by_id[oid][1] for cid,_ in cliques for oid in cid}
-    features = set(feat_of.values())
-    by_feat: Dict[str, Set[str]] = {f:set() for f in features}
+    ctx = ensure_context(objects_by_id, ctx)
+    feat_of = ctx.feature_of
+    by_feat: Dict[str, Set[str]] = {}
     for cid,_ in cliques:
         for oid in cid:
-            by_feat[feat_of[oid]].add(oid)
-    # total counts per feature in the dataset
-    total_by_feat = {}
-    for oid, obj in objects_by_id.items():
-        f = obj[1]
-        if f in features:
-            total_by_feat[f] = total_by_feat.get(f, 0) + 1
+            by_feat.setdefault(feat_of[oid], set()).add(oid)
+    total_by_feat = ctx.feature_totals
     ratios = []
-    for f in features:
-        num = len(by_feat[f])
+    for f, seen in by_feat.items():
         den = total_by_feat[f]
-        ratios.append(num / den if den else 0.0)
+        ratios.append(len(seen) / den if den else 0.0)
     return min(ratios) if ratios else 0.0
+
+def pi_from_participants(participants: Iterable, feature_of, totals) -> float:
+    """PI from the distinct participating objects; works on ids + dicts or ints + arrays."""
+    counts = {}
+    for o in participants:
+        f = feature_of[o]
+        counts[f] = counts.get(f, 0) + 1
+    return min(c / totals[f] for f, c in counts.items()) if counts else 0.0
+
+def critical_distance_sweep(first: dict, feature_of, totals, min_prev: float, d1: float,
+                            diameters: Iterable[float]):
+    """Sort-and-sweep: smallest clique diameter d >= d1 with PI(d) >= min_prev.
+
+    first: object -> first-participation distance (the smallest diameter of a
+    clique containing it); the object counts toward PI from there on. Sweeping
+    objects in that order with per-feature counters, plus a count of features
+    still below min_prev, updates PI in O(1) per object.
+    diameters: all clique diameters, for when PI already holds below d1.
+    """
+    if not first:
+        return None
+    features = {feature_of[o] for o in first}
+    count = {f:0 for f in features}
+    below = len(features) if min_prev > 0 else 0
+    reached = None if below else -math.inf
+    if below:
+        for o, d in sorted(first.items(), key=lambda kv: kv[1]):
+            f = feature_of[o]
+            count[f] += 1
+            # crossing happens exactly once per feature since counts only grow
+            if (count[f] - 1) / totals[f] < min_prev <= count[f] / totals[f]:
+                below -= 1
+                if not below:
+                    reached = d
+                    break
+    if reached is None:
+        return None
+    if reached >= d1:
+        return reached
+    # prevalent already below d1: PI stays above min_prev, answer is the first diameter >= d1
+    return min((dia for dia in diameters if dia >= d1), default=None)
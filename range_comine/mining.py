@@ -1,32 +1,35 @@
 
 from typing import List, Dict, Tuple, Iterable, Set
 from collections import defaultdict
-import itertools, math
-from .neighbors import build_star_neighborhood
+import heapq, itertools, math, time
+import multiprocessing as mp
+from .neighbors import build_star_arrays
+from .context import DatasetContext, ensure_context
+from .metrics import pi_from_participants, critical_distance_sweep
+from .instances import InstanceTable, ParticipationBound, size2_tables, join_tables, first_participation
+from .stats import MiningStats, phase
 
 # Helpers
 def pattern_features(pattern: Tuple[str,...]) -> Tuple[str,...]:
     return tuple(sorted(pattern))
 
 def candidate_join(prev: List[Tuple[str,...]]) -> List[Tuple[str,...]]:
-    """Apriori candidate generation from prevalent (k-1)-patterns"""
-    prev_sorted = [tuple(sorted(p)) for p in prev]
-    prev_sorted = sorted(set(prev_sorted))
-    k = len(prev_sorted[0]) + 1 if prev_sorted else 1
-    C = set()
-    for i in range(len(prev_sorted)):
-        for j in range(i+1, len(prev_sorted)):
-            p, q = prev_sorted[i], prev_sorted[j]
-            if p[:-1] == q[:-1]:
-                cand = tuple(sorted(set(p) | set(q)))
-                if len(cand) == k:
-                    # prune: all (k-1)-subsets must be in prev
-                    ok = True
-                    for sub in itertools.combinations(cand, k-1):
-                        if tuple(sorted(sub)) not in prev_sorted:
-                            ok = False; break
-                    if ok:
-                        C.add(cand)
+    """Apriori candidate generation from prevalent (k-1)-patterns.
+    Patterns are bucketed by their (k-2)-prefix, so only pairs sharing a prefix are
+    joined; the remaining (k-1)-subsets of a candidate are looked up in a set."""
+    prev_set = {tuple(sorted(p)) for p in prev}
+    by_prefix: Dict[tuple, list] = defaultdict(list)
+    for p in sorted(prev_set):
+        by_prefix[p[:-1]].append(p[-1])
+    C = []
+    for prefix, lasts in by_prefix.items():
+        for i in range(len(lasts)):
+            for j in range(i+1, len(lasts)):
+                cand = prefix + (lasts[i], lasts[j])
+                # prune: all (k-1)-subsets must be in prev; dropping either of the
+                # last two items gives the joined pair itself
+                if all(cand[:m] + cand[m+1:] in prev_set for m in range(len(prefix))):
+                    C.append(cand)
     return sorted(C)
 
 def clique_diameter(clique_obj_ids: Tuple[str,...], objects_by_id: Dict[str, tuple]) -> float:
@@ -40,7 +43,22 @@ def clique_diameter(clique_obj_ids: Tuple[str,...], objects_by_id: Dict[str, tup
                 maxd = d
     return maxd
 
+def size2_cliques_by_pair(star: Dict[str, list], objects_by_id: Dict[str, tuple], dmax: float = math.inf):
+    """Size-2 cliques of every feature pair in one pass over the star edges:
+    sorted feature pair -> [((id_a, id_b), distance)] for distances <= dmax.
+    Each distinct-feature edge lives only in the star of its larger-feature object."""
+    out: Dict[Tuple[str,str], list] = {}
+    for center, neighs in star.items():
+        cfeat = objects_by_id[center][1]
+        for (nid, nfeat, dist) in neighs:
+            if nfeat == cfeat or dist > dmax:
+                continue
+            a, b = sorted((center, nid))
+            out.setdefault((nfeat, cfeat) if nfeat < cfeat else (cfeat, nfeat), []).append(((a, b), dist))
+    return out
+
 def enumerate_size2_cliques(features: Tuple[str,str], star: Dict[str, list], objects_by_id: Dict[str, tuple], dmax: float):
+    """Size-2 cliques of one feature pair (a full star pass; use size2_cliques_by_pair for all pairs)."""
     f1, f2 = features
     # build all pairs (o_i in f1, o_j in f2) such that both within dmax (already guaranteed by star)
     cliques = []
@@ -71,149 +89,322 @@ def enumerate_size2_cliques(features: Tuple[str,str], star: Dict[str, list], obj
 
 def filter_k_cliques(cand: Tuple[str,...], star: Dict[str, list], objects_by_id: Dict[str, tuple], dmax: float):
     """
-    Build clique instances for k>=3 by joining size-2 edges implicitly.
-    Naive approach: generate all combinations of objects where each feature appears exactly once,
-    and keep those whose pairwise distances <= dmax.
-    This is exponential; suitable for small demos.
+    Build clique instances for k>=3 join-less, from star instances.
+    A star keeps neighbors whose feature is <= the center feature, so every clique
+    of `cand` lies in the star of its object with the largest feature. For each such
+    center, instances are grown one feature at a time, extending a partial instance
+    only with center-star neighbors within dmax of every member; the diameter is
+    carried along as the running max of the checked edges.
     """
-    # gather object ids by feature
-    by_feat = defaultdict(list)
-    for oid, obj in objects_by_id.items():
-        if obj[1] in cand:
-            by_feat[obj[1]].append(oid)
-    # ordered feature list for consistent product
-    feats = list(cand)
-    lists = [by_feat[f] for f in feats]
+    feats = sorted(cand)
+    pos = {f:i for i,f in enumerate(feats[:-1])}
     cliques = []
-    for combo in itertools.product(*lists):
-        # ensure exactly one per feature; product already guarantees that
-        # check pairwise distances
-        ok = True
-        for i in range(len(combo)):
-            oi = objects_by_id[combo[i]]
-            for j in range(i+1, len(combo)):
-                oj = objects_by_id[combo[j]]
-                d = math.hypot(oi[2]-oj[2], oi[3]-oj[3])
-                if d > dmax:
-                    ok = False; break
-            if not ok:
+    for center, neighs in star.items():
+        oc = objects_by_id[center]
+        if oc[1] != feats[-1]:
+            continue
+        # star instance: center neighbors within dmax, bucketed by feature
+        by_feat = [[] for _ in pos]
+        for nid, nfeat, dist in neighs:
+            i = pos.get(nfeat)
+            if i is not None and dist <= dmax:
+                by_feat[i].append((objects_by_id[nid], dist))
+        if not all(by_feat):
+            continue
+        partial = [((), 0.0)]
+        for bucket in by_feat:
+            grown = []
+            for members, dia in partial:
+                for o, dc in bucket:
+                    d_new = dc
+                    for m in members:
+                        d = math.hypot(m[2]-o[2], m[3]-o[3])
+                        if d > d_new:
+                            d_new = d
+                            if d > dmax:
+                                break
+                    if d_new <= dmax:
+                        grown.append((members + (o,), d_new if d_new > dia else dia))
+            partial = grown
+            if not partial:
                 break
-        if ok:
-            cid = tuple(sorted(combo))
-            dia = 0.0
-            # find diameter
-            for i in range(len(combo)):
-                oi = objects_by_id[combo[i]]
-                for j in range(i+1, len(combo)):
-                    oj = objects_by_id[combo[j]]
-                    dd = math.hypot(oi[2]-oj[2], oi[3]-oj[3])
-                    if dd > dia: dia = dd
+        for members, dia in partial:
+            cid = tuple(sorted([center] + [m[0] for m in members]))
             cliques.append((cid, dia))
-    # deduplicate
-    uniq = {}
-    for cid, dia in cliques:
-        if (cid not in uniq) or (dia < uniq[cid]):
-            uniq[cid] = dia
-    return [(cid, uniq[cid]) for cid in uniq.keys()]
+    return cliques
 
-def _critical_distance_from_cliques(cliques, objects_by_id, min_prev, d1):
-    """Three-step method: map -> cumulative union -> PI per candidate distance -> smallest d >= d1 with PI>=min_prev"""
+def _critical_distance_from_cliques(cliques, objects_by_id, min_prev, d1, ctx: DatasetContext = None):
+    """Smallest clique diameter d >= d1 with PI(d) >= min_prev (see metrics.critical_distance_sweep)."""
     if not cliques:
         return None
-    # 1) map from diameter to per-feature object sets
-    # collect features in pattern
-    features = set(objects_by_id[oid][1] for cid,_ in cliques for oid in cid)
-    diameters = sorted({dia for _, dia in cliques})
-    per_d_feat_objs = {d: {f:set() for f in features} for d in diameters}
+    first = {}
     for cid, dia in cliques:
         for oid in cid:
-            f = objects_by_id[oid][1]
-            per_d_feat_objs[dia][f].add(oid)
-    # 2) cumulative union from smallest to largest diameter
-    cum = {}
-    running = {f:set() for f in features}
-    for d in diameters:
-        for f in features:
-            running[f] = set(running[f]) | per_d_feat_objs[d][f]
-        cum[d] = {f:set(running[f]) for f in features}
-    # 3) compute PI at each candidate distance and pick smallest >= d1 that meets threshold
-    # total instances per feature
-    total_by_feat = {}
-    for oid, obj in objects_by_id.items():
-        f = obj[1]
-        if f in features:
-            total_by_feat[f] = total_by_feat.get(f, 0) + 1
-    best = None
-    for d in diameters:
-        if d < d1: 
-            continue
-        pis = []
-        for f in features:
-            num = len(cum[d][f])
-            den = total_by_feat[f]
-            pis.append(num/den if den else 0.0)
-        pi = min(pis) if pis else 0.0
-        if pi >= min_prev:
-            best = d
-            break
-    return best
-
-def range_comine(objects, d1: float, d2: float, min_prev: float):
-    """Single-pass Range–CoMine (demo-scale). Returns ColList: dict critical_distance -> [patterns].
-    objects: list of (id, feature, x, y)
+            d = first.get(oid)
+            if d is None or dia < d:
+                first[oid] = dia
+    ctx = ensure_context(objects_by_id, ctx)
+    return critical_distance_sweep(first, ctx.feature_of, ctx.feature_totals, min_prev, d1,
+                                   (dia for _, dia in cliques))
+
+def _star_join_instances(ctx: DatasetContext, d2: float):
+    """Default instance source of range_comine: size-2 instances are handed out from
+    the single-pass size2_tables, passed to iter_levels as `pairs` (they arrive as
+    tables_prev at level 2); k >= 3 by joining the tables of the two prevalent
+    (k-1)-parents, stopping early (returning None) once `bound` rules the candidate out."""
+    def instances(cand, tables_prev, bound=None):
+        if len(cand) == 2:
+            return tables_prev.pop(cand, None) or InstanceTable(2)
+        # both join parents are prevalent (k-1)-patterns by construction of Ck
+        return join_tables(tables_prev[cand[:-1]], tables_prev[cand[:-2] + cand[-1:]], ctx.xs, ctx.ys, d2, bound, ctx.codes)
+    return instances
+
+def _min_allowed(cand, critical) -> float:
+    """CDMP bound of a candidate: the max critical distance of its (k-1)-subpatterns
+    (-inf for k = 2). Only instances with diameter >= it count, so it also bounds
+    the candidate's own critical distance from below."""
+    if len(cand) == 2:
+        return -math.inf
+    subs = [tuple(sorted(sub)) for sub in itertools.combinations(cand, len(cand)-1)]
+    return max(critical[s] for s in subs if s in critical)
+
+class _TopK:
+    """The k best (smallest critical distance) patterns seen so far, as a bounded heap.
+    Ties are broken by size, then by feature codes."""
+    def __init__(self, k: int):
+        self.k = k
+        self.heap = []   # max-heap via negated keys
+
+    @property
+    def kth(self) -> float:
+        """Critical distance a new pattern must not exceed to enter (inf until k are kept)."""
+        return -self.heap[0][0] if len(self.heap) >= self.k else math.inf
+
+    def push(self, cr: float, cand: tuple):
+        item = (-cr, -len(cand), tuple(-c for c in cand))
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        elif item > self.heap[0]:
+            heapq.heapreplace(self.heap, item)
+
+    def items(self):
+        return [(-ncr, tuple(-c for c in ncand)) for ncr, _, ncand in self.heap]
+
+def _evaluate_candidate(cand, instances, tables_prev, critical, ctx, d1, min_prev, stats=None, top=None):
+    """Instances, PI check at d2 and critical distance of one candidate.
+    Returns (table, critical distance) if prevalent, else None.
+    top: optional _TopK; the candidate is skipped when its CDMP bound already
+    exceeds the current k-th best critical distance."""
+    codes, totals = ctx.codes, ctx.totals
+    k = len(cand)
+    # coarse pruning by CDMP: require diameter >= max critical of subpatterns
+    min_allowed = _min_allowed(cand, critical)
+    if top is not None and min_allowed > top.kth:
+        # its critical distance is >= min_allowed: it cannot enter the top-k
+        if stats is not None:
+            stats.count(k, "pruned_topk")
+        return None
+    # build clique instances at d2, abandoning candidates that cannot reach min_prev
+    t0 = time.perf_counter() if stats is not None else 0.0
+    table = instances(cand, tables_prev, ParticipationBound(totals, min_prev, min_allowed))
+    if stats is not None:
+        t1 = time.perf_counter()
+        stats.add_time("enumerate", t1 - t0)
+        if table is None:
+            stats.count(k, "aborted"); stats.count(k, "pruned_pi")
+            return None
+        stats.count(k, "instances", len(table))
+        stats.peak(k, "peak_table", len(table))
+        stats.peak(k, "peak_table_bytes", table.nbytes())
+    if table is None:
+        return None
+    # check prevalence at d2
+    first = first_participation(table, min_allowed)
+    if not first:
+        if stats is not None:
+            stats.add_time("pi_check", time.perf_counter() - t1)
+            if len(table):
+                stats.count(k, "pruned_cdmp")
+                stats.count(k, "cdmp_filtered", len(table))
+            else:
+                stats.count(k, "pruned_pi")   # no instance within d2
+        return None
+    if stats is not None and min_allowed > -math.inf:
+        stats.count(k, "cdmp_filtered", sum(1 for dia in table.dias if dia < min_allowed))
+    if pi_from_participants(first, codes, totals) < min_prev:
+        if stats is not None:
+            stats.add_time("pi_check", time.perf_counter() - t1)
+            stats.count(k, "pruned_pi")
+        return None
+    # compute critical distance
+    if stats is not None:
+        t2 = time.perf_counter()
+        stats.add_time("pi_check", t2 - t1)
+    cr = critical_distance_sweep(first, codes, totals, min_prev, d1,
+                                 (dia for dia in table.dias if dia >= min_allowed))
+    if stats is not None:
+        stats.add_time("critical_distance", time.perf_counter() - t2)
+        if cr is None:
+            stats.count(k, "pruned_pi")
+    if cr is None:
+        return None
+    return table, cr
+
+# Read-only level state inherited by forked workers (never pickled per task).
+_FORK_STATE = None
+
+def _evaluate_forked(cand):
+    return _evaluate_candidate(cand, *_FORK_STATE)
+
+def _evaluate_level(Ck, state, workers):
+    """Evaluate one level's candidates, in Ck order, optionally over a fork-based process pool.
+    Serially, candidates are evaluated lazily, so a top-k cutoff tightened by the
+    results consumed so far already applies to the next candidate."""
+    global _FORK_STATE
+    if not workers or workers <= 1 or len(Ck) < 2 or "fork" not in mp.get_all_start_methods():
+        return (_evaluate_candidate(cand, *state) for cand in Ck)
+    # a fresh pool per level: workers fork after this level's tables exist;
+    # per-candidate stats would stay in the workers, so they are not collected,
+    # and the top-k cutoff stays fixed for the level (no candidate of Ck exceeds it)
+    _FORK_STATE = state[:-2] + (None, None)
+    try:
+        with mp.get_context("fork").Pool(min(workers, len(Ck))) as pool:
+            chunksize = max(1, len(Ck) // (4 * workers))
+            return pool.map(_evaluate_forked, Ck, chunksize=chunksize)
+    finally:
+        _FORK_STATE = None
+
+def iter_levels(ctx: DatasetContext, instances, d1: float, min_prev: float, workers: int = None,
+                stats: MiningStats = None, max_size: int = None, top: _TopK = None, pairs: dict = None):
     """
-    star, objects_by_id, features = build_star_neighborhood(objects, d2)
+    Level-wise Apriori loop of Range–CoMine over interned features.
+    instances(cand, tables_prev, bound) -> InstanceTable of cand at d2, where tables_prev
+    holds the tables of the prevalent (k-1)-patterns; it may return None once the
+    ParticipationBound `bound` shows cand cannot be prevalent.
+    stats: optional MiningStats (per-candidate counters need workers <= 1)
+    max_size: stop after patterns of this size
+    pairs: optional size-2 tables, passed to instances as tables_prev at level 2 and
+      cleared once level 2 is merged (forked workers only empty their own copy)
+    top: optional _TopK of the patterns of size >= 2. Patterns above its k-th critical
+      distance are dropped (with their supersets) and kept tables are cut at it
+      after each level; serially, candidates whose CDMP bound exceeds the current
+      k-th distance are also skipped before enumeration.
+    Yields (critical distance, code tuple) as each pattern is confirmed: level by
+    level, in candidate order within a level. Only the previous and the current
+    level (tables, critical distances) are held.
+    """
+    F = len(ctx.features)
     # size-1 are always prevalent; critical distance = d1
-    P_prev = [(f,) for f in features]
-    ColList = defaultdict(list)
-    for f in features:
-        ColList[d1].append((f,))
+    P_prev = [(c,) for c in range(F)]
+    for c in range(F):
+        yield d1, (c,)
     # k=2: enumerate cliques directly from star
     # then iteratively grow
     k = 2
-    # track critical distances for CDMP pruning
-    critical = { (f,): d1 for f in features }
-    while P_prev:
+    # critical distances of the previous level, for CDMP pruning
+    critical = { (c,): d1 for c in range(F) }
+    # instance tables of the prevalent (k-1)-patterns
+    tables_prev = pairs if pairs is not None else {}
+    while P_prev and (max_size is None or k <= max_size):
         # candidates
-        Ck = candidate_join(P_prev) if k>2 else [
-            tuple(sorted(pair)) for pair in itertools.combinations(features, 2)
-        ]
+        t0 = time.perf_counter() if stats is not None else 0.0
+        Ck = candidate_join(P_prev) if k>2 else list(itertools.combinations(range(F), 2))
+        state = (instances, tables_prev, critical, ctx, d1, min_prev, stats, top)
         Pk = []
-        for cand in Ck:
-            # build clique instances at d2
-            if k == 2:
-                cliques = enumerate_size2_cliques(cand, star, objects_by_id, d2)
-            else:
-                # coarse pruning by CDMP: require diameter >= max critical of subpatterns
-                subs = [tuple(sorted(sub)) for sub in itertools.combinations(cand, k-1)]
-                min_allowed = max(critical[s] for s in subs if s in critical)
-                cliques_all = filter_k_cliques(cand, star, objects_by_id, d2)
-                cliques = [(cid, dia) for (cid, dia) in cliques_all if dia >= min_allowed]
-            # check prevalence at d2
-            # compute PI at d2 using distinct object counts per feature at d2
-            # fast path: build sets per feature from cliques
-            if not cliques:
-                continue
-            feats = set(cand)
-            total_by_feat = {f:0 for f in feats}
-            for oid,obj in objects_by_id.items():
-                if obj[1] in feats:
-                    total_by_feat[obj[1]] += 1
-            seen_by_feat = {f:set() for f in feats}
-            for cid,_ in cliques:
-                for oid in cid:
-                    seen_by_feat[objects_by_id[oid][1]].add(oid)
-            pi = min(len(seen_by_feat[f])/total_by_feat[f] for f in feats)
-            if pi < min_prev:
-                continue
-            # compute critical distance
-            cr = _critical_distance_from_cliques(cliques, objects_by_id, min_prev, d1)
-            if cr is None:
+        tables_k = {}
+        critical_k = {}
+        for cand, res in zip(Ck, _evaluate_level(Ck, state, workers)):
+            if res is None:
                 continue
+            table, cr = res
+            if top is not None:
+                if cr > top.kth:
+                    if stats is not None:
+                        stats.count(k, "pruned_topk")
+                    continue
+                top.push(cr, cand)
             Pk.append(cand)
-            critical[cand] = cr
-            ColList[cr].append(cand)
+            tables_k[cand] = table
+            critical_k[cand] = cr
+            yield cr, cand
+        if top is not None and top.kth < math.inf:
+            # instances above the k-th best distance cannot matter to any superset
+            kth = top.kth
+            kept = [cand for cand in Pk if critical_k[cand] <= kth]
+            if stats is not None:
+                stats.count(k, "pruned_topk", len(Pk) - len(kept))
+            Pk = kept
+            tables_k = {cand: tables_k[cand].up_to(kth) for cand in Pk}
+        if stats is not None:
+            stats.add_time(f"level_{k}", time.perf_counter() - t0)
+            stats.count(k, "candidates", len(Ck))
+            stats.count(k, "prevalent", len(Pk))
+            stats.peak(k, "peak_table", max((len(t) for t in tables_k.values()), default=0))
+            stats.level_done(k)
+        if k == 2 and pairs is not None:
+            # kept pairs live on in tables_k; free the rest (and the parent's copies)
+            pairs.clear()
         P_prev = Pk
+        tables_prev = tables_k
+        critical = critical_k
         k += 1
-    # sort ColList keys
-    return dict(sorted((d, sorted(v)) for d,v in ColList.items()))
+
+def mine_levels(ctx: DatasetContext, instances, d1: float, min_prev: float, workers: int = None,
+                stats: MiningStats = None, max_size: int = None, top_k: int = None, pairs: dict = None):
+    """iter_levels collected into the ColList, with feature names restored.
+    top_k: keep only the top_k patterns of size >= 2 with the smallest critical distance."""
+    top = _TopK(top_k) if top_k else None
+    ColList = defaultdict(list)
+    for cr, cand in iter_levels(ctx, instances, d1, min_prev, workers, stats, max_size, top, pairs):
+        if top is None:
+            ColList[cr].append(cand)
+    if top is not None:
+        for cr, cand in top.items():
+            ColList[cr].append(cand)
+    # sort ColList keys (feature names restored here)
+    return dict(sorted((d, sorted(ctx.pattern_names(p) for p in v)) for d,v in ColList.items()))
+
+def range_comine(objects, d1: float, d2: float, min_prev: float, workers: int = None,
+                 stats: MiningStats = None, max_size: int = None, top_k: int = None):
+    """Single-pass Range–CoMine (demo-scale). Returns ColList: dict critical_distance -> [patterns].
+    objects: list of (id, feature, x, y)
+    workers: if > 1, evaluate each level's candidates on that many forked processes
+      (the size-2 tables and object columns are inherited, results merge in candidate order)
+    stats: optional MiningStats, filled with per-phase times and per-level counters
+    max_size: only mine patterns up to this size
+    top_k: return only the top_k patterns of size >= 2 with the smallest critical
+      distance (ties: smaller patterns first, then by feature names); size-1
+      patterns are left out. Candidates that cannot beat the current k-th best
+      are pruned by the CDMP bound, so the lattice is not fully mined.
+
+    Internally objects and features are interned to ints (DatasetContext) and
+    instances are fixed-width int rows (InstanceTable); feature names are only
+    restored in the returned ColList.
+    """
+    with phase(stats, "context"):
+        ctx = DatasetContext.from_objects(objects)
+    with phase(stats, "star"):
+        star = build_star_arrays(ctx.xs, ctx.ys, ctx.codes, d2)
+    with phase(stats, "size2_tables"):
+        pairs = size2_tables(star, ctx.codes, d2)
+    del star
+    with phase(stats, "mining"):
+        return mine_levels(ctx, _star_join_instances(ctx, d2), d1, min_prev, workers, stats, max_size, top_k, pairs)
+
+def iter_range_comine(objects, d1: float, d2: float, min_prev: float, workers: int = None,
+                      stats: MiningStats = None, max_size: int = None):
+    """
+    Streaming range_comine: yields (critical_distance, pattern) as each pattern is
+    confirmed, level by level, instead of building the ColList. The same pairs as
+    range_comine's ColList, in discovery order.
+    """
+    with phase(stats, "context"):
+        ctx = DatasetContext.from_objects(objects)
+    with phase(stats, "star"):
+        star = build_star_arrays(ctx.xs, ctx.ys, ctx.codes, d2)
+    with phase(stats, "size2_tables"):
+        pairs = size2_tables(star, ctx.codes, d2)
+    del star
+    for cr, cand in iter_levels(ctx, _star_join_instances(ctx, d2), d1, min_prev, workers, stats, max_size,
+                                pairs=pairs):
+        yield cr, ctx.pattern_names(cand)
@@ -1,14 +1,87 @@
-
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, NamedTuple
 from collections import defaultdict
+from array import array
 import math
+import numpy as np
 
 # Object record: (id, feature, x, y)
 Obj = Tuple[str, str, float, float]
+Cell = Tuple[int, int]
+
+class StarCSR(NamedTuple):
+    """Array-backed star neighborhood.
+
+    Neighbors of object i are indices[offsets[i]:offsets[i+1]] (ascending, self
+    included) with matching dists. Object indices refer to the input arrays.
+    Fields are NumPy arrays (`build_star_csr`) or array.array (`build_star_arrays`).
+    """
+    offsets: np.ndarray   # int64, len n+1
+    indices: np.ndarray   # int32, len nnz
+    dists: np.ndarray     # float32 by default, len nnz
 
 def euclid(a: Obj, b: Obj) -> float:
     return math.hypot(a[2] - b[2], a[3] - b[3])
 
+def cell_of(x: float, y: float, cell: float) -> Cell:
+    return (math.floor(x / cell), math.floor(y / cell))
+
+def grid_index(xs, ys, cell: float, grid: Dict[Cell, List[int]] = None, offset: int = 0) -> Dict[Cell, List[int]]:
+    """Uniform-grid spatial hash: (cx, cy) -> positions i with (xs[i], ys[i]) in that cell.
+    To build incrementally from chunks, pass the grid so far and the chunk's starting position."""
+    grid = grid if grid is not None else {}
+    for i in range(len(xs)):
+        grid.setdefault(cell_of(xs[i], ys[i], cell), []).append(offset + i)
+    return grid
+
+def grid_candidates(grid: Dict[Cell, List[int]], c: Cell) -> List[int]:
+    """Indices in the 3x3 block of cells around `c`, ascending (= input order)."""
+    cx, cy = c
+    out = []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            out.extend(grid.get((cx + dx, cy + dy), ()))
+    out.sort()
+    return out
+
+def build_star_arrays(xs, ys, codes, dmax: float) -> StarCSR:
+    """
+    Star neighborhood over interned columns (object i = position i), as a StarCSR
+    of array('q') offsets, array('i') indices and array('d') dists.
+    Objects are bucketed into a uniform grid with cell size dmax, so every
+    neighbor within dmax lies in the 3x3 block around the center's cell.
+    Neighbors are ascending by index; distances are exact (math.hypot).
+    """
+    n = len(xs)
+    # cell size must be > 0; any size works for dmax == 0 (coincident points only)
+    cell = dmax if dmax > 0 else 1.0
+    grid = grid_index(xs, ys, cell)
+    rows = [None] * n
+    for c, members in grid.items():
+        cands = grid_candidates(grid, c)
+        for i in members:
+            xi, yi, ci = xs[i], ys[i], codes[i]
+            nbrs = array('i')
+            dists = array('d')
+            for j in cands:
+                if i == j:
+                    # self-loop with distance 0 (useful for diameter logic)
+                    nbrs.append(j); dists.append(0.0)
+                    continue
+                if codes[j] > ci:
+                    continue
+                d = math.hypot(xi - xs[j], yi - ys[j])
+                if d <= dmax:
+                    nbrs.append(j); dists.append(d)
+            rows[i] = (nbrs, dists)
+    offsets = array('q', [0])
+    indices = array('i')
+    dists = array('d')
+    for nbrs, ds in rows:
+        indices.extend(nbrs)
+        dists.extend(ds)
+        offsets.append(len(indices))
+    return StarCSR(offsets, indices, dists)
+
 def build_star_neighborhood(objects: List[Obj], dmax: float):
     """
     Build star neighborhood SNd for maximum distance dmax.
@@ -18,21 +91,26 @@ def build_star_neighborhood(objects: List[Obj], dmax: float):
       feature_order: deterministic order of features (sorted by name)
     Definition (adapted): only keep neighbors whose feature is <= center feature
     in a total order, to avoid duplicates (joinless/star schema).
+
+    Built with the grid of `build_star_arrays`; neighbor lists keep input
+    order, same as `build_star_neighborhood_naive`.
     """
-    # deterministic total order by feature string
+    xs, ys, codes, _ = objects_to_arrays(objects, backend="array")
+    return star_from_csr(build_star_arrays(xs, ys, codes, dmax), objects)
+
+def build_star_neighborhood_naive(objects: List[Obj], dmax: float):
+    """Reference O(n^2) build of the star neighborhood (same output as `build_star_neighborhood`)."""
     features = sorted({o[1] for o in objects})
     feat_index = {f:i for i,f in enumerate(features)}
     objects_by_id = {o[0]: o for o in objects}
 
     star = defaultdict(list)
     n = len(objects)
-    # O(n^2) naive; fine for demo-scale
     for i in range(n):
         oi = objects[i]
         for j in range(n):
             oj = objects[j]
             if i == j:
-                # self-loop with distance 0 (useful for diameter logic)
                 star[oi[0]].append((oj[0], oj[1], 0.0))
                 continue
             d = euclid(oi, oj)
@@ -41,3 +119,88 @@ def build_star_neighborhood(objects: List[Obj], dmax: float):
                 if feat_index[oj[1]] <= feat_index[oi[1]]:
                     star[oi[0]].append((oj[0], oj[1], d))
     return dict(star), objects_by_id, features
+
+def objects_to_arrays(objects: List[Obj], backend: str = "numpy"):
+    """Split object tuples into (xs, ys, feature_codes, features) with codes in sorted-feature order.
+    backend: "numpy" (float64 / int32 arrays, for build_star_csr) or "array"
+    (array('d') / array('i'), for build_star_arrays)."""
+    features = sorted({o[1] for o in objects})
+    feat_index = {f:i for i,f in enumerate(features)}
+    if backend == "array":
+        return (array('d', (o[2] for o in objects)), array('d', (o[3] for o in objects)),
+                array('i', (feat_index[o[1]] for o in objects)), features)
+    if backend != "numpy":
+        raise ValueError(f"backend must be 'numpy' or 'array', got {backend!r}")
+    xs = np.fromiter((o[2] for o in objects), dtype=np.float64, count=len(objects))
+    ys = np.fromiter((o[3] for o in objects), dtype=np.float64, count=len(objects))
+    codes = np.fromiter((feat_index[o[1]] for o in objects), dtype=np.int32, count=len(objects))
+    return xs, ys, codes, features
+
+def build_star_csr(xs, ys, feat_codes, dmax: float, block: int = 65536, dist_dtype=np.float32) -> StarCSR:
+    """
+    Vectorized star neighborhood over coordinate arrays.
+    Same star condition as `build_star_neighborhood` (neighbor feature code <= center
+    code, self-loop kept). Objects are sorted by grid cell (size dmax) and, `block`
+    centers at a time, paired with every object of the 3x3 surrounding cells;
+    distances for the whole block are computed in one shot. Distances are tested
+    in float64 and stored as `dist_dtype`.
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    fc = np.asarray(feat_codes)
+    n = len(xs)
+    if n == 0:
+        return StarCSR(np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=dist_dtype))
+    cell = dmax if dmax > 0 else 1.0
+    cx = np.floor(xs / cell).astype(np.int64)
+    cy = np.floor(ys / cell).astype(np.int64)
+    # linear cell key with a one-cell margin so key + dx*width + dy never aliases
+    width = int(cy.max() - cy.min()) + 3
+    key = (cx - cx.min() + 1) * width + (cy - cy.min() + 1)
+    order = np.argsort(key, kind="stable")
+    skey = key[order]
+    offsets9 = [dx * width + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+    rows_out, nbrs_out, dists_out = [], [], []
+    for b0 in range(0, n, block):
+        centers = order[b0:b0 + block]
+        ckey = skey[b0:b0 + block]
+        for off in offsets9:
+            lo = np.searchsorted(skey, ckey + off, side="left")
+            hi = np.searchsorted(skey, ckey + off, side="right")
+            cnt = hi - lo
+            total = int(cnt.sum())
+            if total == 0:
+                continue
+            src = np.repeat(centers, cnt)
+            first = np.repeat(lo - (np.cumsum(cnt) - cnt), cnt)
+            dst = order[first + np.arange(total)]
+            d = np.hypot(xs[src] - xs[dst], ys[src] - ys[dst])
+            keep = (d <= dmax) & (fc[dst] <= fc[src])
+            rows_out.append(src[keep])
+            nbrs_out.append(dst[keep])
+            dists_out.append(d[keep])
+
+    rows = np.concatenate(rows_out)
+    nbrs = np.concatenate(nbrs_out)
+    dists = np.concatenate(dists_out)
+    # row-major, neighbors ascending (= input order, like the dict build)
+    perm = np.lexsort((nbrs, rows))
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=offsets[1:])
+    return StarCSR(offsets, nbrs[perm].astype(np.int32), dists[perm].astype(dist_dtype))
+
+def star_from_csr(csr: StarCSR, objects: List[Obj]):
+    """Adapter: expand a StarCSR into the (star, objects_by_id, features) triple of `build_star_neighborhood`."""
+    features = sorted({o[1] for o in objects})
+    objects_by_id = {o[0]: o for o in objects}
+    offsets = csr.offsets.tolist()
+    indices = csr.indices.tolist()
+    dists = csr.dists.tolist()
+    star = {}
+    for i, oi in enumerate(objects):
+        neighs = star.setdefault(oi[0], [])
+        for p in range(offsets[i], offsets[i + 1]):
+            oj = objects[indices[p]]
+            neighs.append((oj[0], oj[1], dists[p]))
+    return star, objects_by_id, features
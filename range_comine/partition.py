@@ -0,0 +1,264 @@
+"""Spatially partitioned Range–CoMine.
+
+The plane is cut into square tiles. Each tile mines the objects of its core plus
+a d2-wide halo, so every clique whose star center (largest-feature object) lies
+in the core is fully visible to that tile. A clique is counted only by the tile
+owning its center, which deduplicates cliques crossing tile borders. Tiles report
+per-object first-participation distances; the coordinator merges them into global
+PI and critical distances and broadcasts the prevalent patterns of each level.
+
+Tile state lives in `TileMiner`, which only needs its own columns and exchanges
+small picklable messages, so tiles can run in-process, in worker processes
+(`workers=N`) or behind any other transport. Each runner builds the columns of
+its own tiles from a chunked scan (`tile_specs`); the coordinator keeps only
+the object columns.
+
+Memory: halo objects and their instances are held by every tile that sees them,
+so all tiles in one process take about as much memory as plain `range_comine`
+(more with tiles not much larger than d2). Tiling lowers the per-process peak
+only when the tiles are spread over `workers` processes.
+"""
+from typing import Dict, List, Tuple
+from collections import defaultdict
+from array import array
+import itertools, math
+import multiprocessing as mp
+
+from .neighbors import build_star_arrays
+from .instances import InstanceTable, size2_tables, join_tables
+from .metrics import pi_from_participants, critical_distance_sweep
+from .mining import candidate_join
+
+Tile = Tuple[int, int]
+
+def assign_tiles(members: Dict[Tile, list], xs, ys, tile_size: float, halo: float, offset: int = 0):
+    """Add objects offset+i to every tile whose core + halo contains them (chunk-friendly)."""
+    for i in range(len(xs)):
+        x, y = xs[i], ys[i]
+        core = (math.floor(x / tile_size), math.floor(y / tile_size))
+        for tx in range(math.floor((x - halo) / tile_size), math.floor((x + halo) / tile_size) + 1):
+            for ty in range(math.floor((y - halo) / tile_size), math.floor((y + halo) / tile_size) + 1):
+                members.setdefault((tx, ty), []).append((offset + i, (tx, ty) == core))
+    return members
+
+def partition_tiles(xs, ys, tile_size: float, halo: float, members: Dict[Tile, list] = None) -> Dict[Tile, Tuple[array, bytearray]]:
+    """tile -> (object ints in core + halo, ascending; owned flags, 1 if in the core).
+    `members` may be pre-filled chunk by chunk with `assign_tiles`."""
+    if members is None:
+        members = assign_tiles({}, xs, ys, tile_size, halo)
+    out = {}
+    for t, ms in members.items():
+        if any(own for _, own in ms):
+            out[t] = (array('i', (i for i, _ in ms)), bytearray(own for _, own in ms))
+    return dict(sorted(out.items()))
+
+def core_tiles(xs, ys, tile_size: float) -> List[Tile]:
+    """Tiles whose core holds at least one object, sorted."""
+    return sorted({(math.floor(xs[i] / tile_size), math.floor(ys[i] / tile_size)) for i in range(len(xs))})
+
+def tile_specs(xs, ys, codes, tile_size: float, halo: float, wanted, chunk_size: int = 65536):
+    """
+    (gids, owned, xs, ys, codes) of every tile in `wanted` (in that order), from a
+    scan of the columns `chunk_size` objects at a time; members of other tiles are
+    never collected.
+    """
+    wanted = list(wanted)
+    members = {t: (array('i'), bytearray()) for t in wanted}
+    for lo in range(0, len(xs), chunk_size):
+        for t, ms in assign_tiles({}, xs[lo:lo+chunk_size], ys[lo:lo+chunk_size], tile_size, halo, lo).items():
+            dest = members.get(t)
+            if dest is not None:
+                dest[0].extend(i for i, _ in ms)
+                dest[1].extend(own for _, own in ms)
+    for t in wanted:
+        gids, owned = members.pop(t)
+        yield (gids, owned, array('d', (xs[g] for g in gids)), array('d', (ys[g] for g in gids)),
+               array('i', (codes[g] for g in gids)))
+
+class TileMiner:
+    """Instance tables of one tile (core + halo), over tile-local object ints.
+    gids: local -> global object int; owned: 1 for core objects; xs, ys, codes: local columns
+    """
+    def __init__(self, gids: array, owned: bytearray, xs: array, ys: array, codes: array, d2: float):
+        self.gids = gids
+        self.owned = owned
+        self.xs, self.ys, self.codes = xs, ys, codes
+        self.d2 = d2
+        self.tables: Dict[tuple, InstanceTable] = {}
+        self.pending: Dict[tuple, InstanceTable] = {}
+
+    def evaluate(self, k: int, cands: List[tuple], min_allowed: Dict[tuple, float], d1: float):
+        """
+        Build this tile's k-instances of every candidate and summarize the owned ones:
+        cand -> (global object int -> first-participation distance, smallest owned diameter >= d1).
+        Only instances with diameter >= min_allowed[cand] (CDMP) are summarized.
+        """
+        out = {}
+        self.pending = {}
+        # the star is only needed for the size-2 tables, so it is not kept
+        pairs = size2_tables(build_star_arrays(self.xs, self.ys, self.codes, self.d2), self.codes, self.d2) \
+            if k == 2 else None
+        for cand in cands:
+            if k == 2:
+                table = pairs.get(cand, InstanceTable(2))
+            else:
+                tp, tq = self.tables.get(cand[:-1]), self.tables.get(cand[:-2] + cand[-1:])
+                if tp is None or tq is None:
+                    continue
+                table = join_tables(tp, tq, self.xs, self.ys, self.d2)
+            if not len(table):
+                continue
+            # kept whether owned or not: halo instances feed joins of owned ones
+            self.pending[cand] = table
+            summary = self._owned_summary(table, min_allowed.get(cand, -math.inf), d1)
+            if summary[0]:
+                out[cand] = summary
+        return out
+
+    def advance(self, prevalent):
+        """Keep the tables of globally prevalent patterns for the next level's joins."""
+        self.tables = {c: t for c, t in self.pending.items() if c in prevalent}
+        self.pending = {}
+
+    def _owned_summary(self, table: InstanceTable, min_dia: float, d1: float):
+        k, rows, gids, owned = table.k, table.rows, self.gids, self.owned
+        first = {}
+        min_ge_d1 = math.inf
+        for i, dia in enumerate(table.dias):
+            # owner: the tile whose core holds the row's last (largest-feature) object
+            if dia < min_dia or not owned[rows[i*k + k - 1]]:
+                continue
+            if d1 <= dia < min_ge_d1:
+                min_ge_d1 = dia
+            for o in rows[i*k:(i+1)*k]:
+                g = gids[o]
+                d = first.get(g)
+                if d is None or dia < d:
+                    first[g] = dia
+        return first, min_ge_d1
+
+class _LocalTiles:
+    """All tiles in this process."""
+    def __init__(self, columns, tiles, tile_size, d2):
+        self.miners = [TileMiner(*spec, d2) for spec in tile_specs(*columns, tile_size, d2, tiles)]
+
+    def evaluate(self, *args):
+        for m in self.miners:
+            yield m.evaluate(*args)
+
+    def advance(self, prevalent):
+        for m in self.miners:
+            m.advance(prevalent)
+
+    def close(self):
+        self.miners = []
+
+def _tile_worker(conn):
+    # the full columns arrive in the first message and are dropped once the
+    # worker's own tiles are built
+    _, columns, tiles, tile_size, d2 = conn.recv()
+    tiles = _LocalTiles(columns, tiles, tile_size, d2)
+    del columns
+    while True:
+        msg = conn.recv()
+        if msg[0] == "evaluate":
+            conn.send(list(tiles.evaluate(*msg[1:])))
+        elif msg[0] == "advance":
+            tiles.advance(msg[1])
+        else:
+            break
+    conn.close()
+
+class _ProcessTiles:
+    """Tiles spread round-robin over persistent worker processes that keep their state across levels.
+    Each worker builds the columns of its own tiles, then drops the full columns."""
+    def __init__(self, columns, tiles, tile_size, d2, workers):
+        self.conns, self.procs = [], []
+        for w in range(min(workers, len(tiles))):
+            parent, child = mp.Pipe()
+            # columns go through the pipe, not Process args, which the child would keep
+            p = mp.Process(target=_tile_worker, args=(child,), daemon=True)
+            p.start()
+            child.close()
+            parent.send(("build", columns, tiles[w::workers], tile_size, d2))
+            self.conns.append(parent); self.procs.append(p)
+
+    def evaluate(self, *args):
+        for c in self.conns:
+            c.send(("evaluate",) + args)
+        for c in self.conns:
+            yield from c.recv()
+
+    def advance(self, prevalent):
+        for c in self.conns:
+            c.send(("advance", prevalent))
+
+    def close(self):
+        for c in self.conns:
+            c.send(("stop",))
+            c.close()
+        for p in self.procs:
+            p.join()
+
+def range_comine_partitioned(objects, d1: float, d2: float, min_prev: float,
+                             tile_size: float = None, workers: int = None):
+    """Range–CoMine over halo-extended spatial tiles. Same ColList as `range_comine`.
+    tile_size: tile edge length (default 10 * d2); halo is d2
+    workers: if > 1, tiles run in that many worker processes
+    """
+    # plain columns; later objects with the same id replace earlier ones, as in DatasetContext
+    objs = {o[0]: o for o in objects}.values()
+    features = sorted({o[1] for o in objs})
+    code_of = {f: c for c, f in enumerate(features)}
+    xs, ys = array('d', (o[2] for o in objs)), array('d', (o[3] for o in objs))
+    codes = array('i', (code_of[o[1]] for o in objs))
+    del objs
+    F = len(features)
+    totals = [0] * F
+    for c in codes:
+        totals[c] += 1
+    if not tile_size:
+        tile_size = 10 * d2 if d2 > 0 else 1.0
+    tiles = core_tiles(xs, ys, tile_size)
+    columns = (xs, ys, codes)
+    runner = _ProcessTiles(columns, tiles, tile_size, d2, workers) if workers and workers > 1 and len(tiles) > 1 \
+        else _LocalTiles(columns, tiles, tile_size, d2)
+    ColList = defaultdict(list)
+    for c in range(F):
+        ColList[d1].append((c,))
+    critical = { (c,): d1 for c in range(F) }
+    P_prev = [(c,) for c in range(F)]
+    k = 2
+    try:
+        while P_prev:
+            Ck = candidate_join(P_prev) if k>2 else list(itertools.combinations(range(F), 2))
+            # CDMP bound per candidate, as in range_comine
+            min_allowed = {} if k == 2 else {
+                cand: max(critical[tuple(sorted(s))] for s in itertools.combinations(cand, k-1)) for cand in Ck}
+            firsts, mins = defaultdict(dict), defaultdict(lambda: math.inf)
+            for summaries in runner.evaluate(k, Ck, min_allowed, d1):
+                for cand, (first, min_ge_d1) in summaries.items():
+                    merged = firsts[cand]
+                    for g, d in first.items():
+                        if g not in merged or d < merged[g]:
+                            merged[g] = d
+                    mins[cand] = min(mins[cand], min_ge_d1)
+            Pk = []
+            for cand in Ck:
+                first = firsts.get(cand)
+                if not first or pi_from_participants(first, codes, totals) < min_prev:
+                    continue
+                cr = critical_distance_sweep(first, codes, totals, min_prev, d1,
+                                             [mins[cand]] if mins[cand] < math.inf else [])
+                if cr is None:
+                    continue
+                Pk.append(cand)
+                critical[cand] = cr
+                ColList[cr].append(cand)
+            runner.advance(set(Pk))
+            P_prev = Pk
+            k += 1
+    finally:
+        runner.close()
+    name = lambda p: tuple(features[c] for c in p)
+    return dict(sorted((d, sorted(name(p) for p in v)) for d,v in ColList.items()))
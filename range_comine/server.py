@@ -0,0 +1,169 @@
+"""Long-running local query server over warm in-memory datasets.
+
+Datasets are loaded once; for Range–CoMine each keeps an InstanceCache (star
+neighborhood + instance tables) warmed at `warm_dmax`, so a query with
+d2 <= warm_dmax only filters cached tables. Queries run on a worker pool: with
+workers > 1, processes forked after warm-up (each inherits the warm caches and
+keeps its own from then on), else one background thread. Identical in-flight
+queries are coalesced into one computation.
+
+HTTP/1.1 over TCP or a Unix socket, JSON responses:
+  GET /datasets                                   {"name": {"objects": n, "features": [...]}}
+  GET /query?dataset=&d1=&d2=&min_prev=&algo=     same JSON as the CLI (ColList)
+  POST /query  with a JSON body of the same fields
+"""
+from typing import Dict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qsl
+import asyncio, json
+import multiprocessing as mp
+
+from .cache import InstanceCache, dataset_fingerprint
+from .baselines import naive_range, range_inc_mining
+from .approx import range_comine_approx
+
+ALGOS = ("range_comine", "naive", "range_inc", "approx")
+
+class _Warm:
+    """One dataset: objects, feature names and its instance cache."""
+    def __init__(self, objects, warm_dmax: float = None, cache_mb: float = 512.0):
+        self.objects = objects
+        self.features = sorted({o[1] for o in objects})
+        self.cache = InstanceCache(max_bytes=int(cache_mb * 2**20))
+        # datasets never change while served: hash them once, not per query
+        self.fingerprint = dataset_fingerprint(objects)
+        if warm_dmax:
+            self.cache.prepare(objects, warm_dmax, self.fingerprint)
+
+    def query(self, algo: str, d1: float, d2: float, min_prev: float):
+        if algo == "range_comine":
+            return self.cache.range_comine(self.objects, d1, d2, min_prev, fingerprint=self.fingerprint)
+        if algo == "approx":
+            res = range_comine_approx(self.objects, d1, d2, min_prev)
+            return {"colist": res.colist,
+                    "estimates": {"+".join(p): e._asdict() for p, e in res.patterns.items()}}
+        fn = naive_range if algo == "naive" else range_inc_mining
+        return fn(self.objects, d1, d2, min_prev)
+
+# datasets of the server, inherited by forked workers
+_WARM: Dict[str, _Warm] = {}
+
+def _answer(name, algo, d1, d2, min_prev) -> str:
+    return json.dumps(_WARM[name].query(algo, d1, d2, min_prev), sort_keys=True)
+
+class QueryError(ValueError):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class QueryServer:
+    """
+    datasets: name -> object list (id, feature, x, y)
+    warm_dmax: build each dataset's star and size-2 tables at this distance up front
+    workers: > 1 forks that many worker processes (after warm-up); else one thread
+    cache_mb: per-dataset instance-cache budget
+    One QueryServer per process (the warm datasets are module state, for forking).
+    """
+    def __init__(self, datasets, warm_dmax: float = None, workers: int = 1, cache_mb: float = 512.0):
+        _WARM.clear()
+        for name, objects in datasets.items():
+            _WARM[name] = _Warm(objects, warm_dmax, cache_mb)
+        if workers > 1 and "fork" in mp.get_all_start_methods():
+            self.pool = ProcessPoolExecutor(workers, mp_context=mp.get_context("fork"))
+        else:
+            # a single thread: the caches are not shared between threads
+            self.pool = ThreadPoolExecutor(1)
+        self.inflight = {}    # query key -> asyncio.Future of the JSON text
+        self.computed = 0     # computations started (coalesced queries count once)
+        self._servers = []
+
+    def datasets(self) -> dict:
+        return {name: {"objects": len(w.objects), "features": w.features} for name, w in _WARM.items()}
+
+    async def query(self, dataset: str, d1: float, d2: float, min_prev: float, algo: str = "range_comine") -> str:
+        """JSON text of the result; identical concurrent queries share one computation."""
+        if dataset not in _WARM:
+            raise QueryError(404, f"unknown dataset {dataset!r}")
+        if algo not in ALGOS:
+            raise QueryError(400, f"algo must be one of {', '.join(ALGOS)}")
+        if not 0 <= d1 <= d2:
+            raise QueryError(400, "need 0 <= d1 <= d2")
+        key = (dataset, algo, d1, d2, min_prev)
+        fut = self.inflight.get(key)
+        if fut is None:
+            self.computed += 1
+            loop = asyncio.get_running_loop()
+            fut = asyncio.ensure_future(loop.run_in_executor(self.pool, _answer, *key))
+            self.inflight[key] = fut
+            fut.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(fut)
+
+    async def _dispatch(self, method: str, target: str, body: bytes):
+        url = urlsplit(target)
+        if url.path == "/datasets" and method == "GET":
+            return json.dumps(self.datasets(), sort_keys=True)
+        if url.path != "/query" or method not in ("GET", "POST"):
+            raise QueryError(404, f"no route {method} {url.path}")
+        params = dict(parse_qsl(url.query))
+        if method == "POST" and body:
+            try:
+                params.update(json.loads(body))
+            except ValueError:
+                raise QueryError(400, "body is not JSON")
+        try:
+            d1, d2, min_prev = (float(params[k]) for k in ("d1", "d2", "min_prev"))
+        except (KeyError, TypeError, ValueError):
+            raise QueryError(400, "d1, d2 and min_prev are required numbers")
+        return await self.query(str(params.get("dataset", "")), d1, d2, min_prev,
+                                str(params.get("algo", "range_comine")))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readline()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                length = int(headers.get("content-length", 0))
+                if length < 0:
+                    raise ValueError(length)
+                body = await reader.readexactly(length)
+                method, target, _ = request.decode("latin-1").split(" ", 2)
+                status, text = 200, await self._dispatch(method, target, body)
+            except QueryError as e:
+                status, text = e.status, json.dumps({"error": str(e)})
+            except ValueError:
+                status, text = 400, json.dumps({"error": "bad request"})
+            except asyncio.IncompleteReadError:
+                raise
+            except Exception as e:   # keep serving; report the failure to the client
+                status, text = 500, json.dumps({"error": f"{type(e).__name__}: {e}"})
+            payload = text.encode()
+            reason = {200: "OK", 400: "Bad Request", 404: "Not Found"}.get(status, "Internal Server Error")
+            writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, unix: str = None):
+        """Start listening (TCP, or a Unix socket when `unix` is given); returns the asyncio server."""
+        if unix:
+            server = await asyncio.start_unix_server(self._handle, unix)
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+        self._servers.append(server)
+        return server
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers.clear()
+        self.pool.shutdown(wait=True)
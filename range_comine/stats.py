@@ -0,0 +1,68 @@
+"""Opt-in instrumentation for the miners.
+
+Pass a `MiningStats` as `stats=` to `range_comine`, `naive_range` or
+`range_inc_mining`. Without it the miners only pay an `is None` check per
+phase / candidate.
+
+Recorded:
+  phases: cumulative wall time (s) per phase name ("star", "level_3", ...)
+  levels: per pattern size k, counters such as
+    candidates         candidates generated
+    instances          clique instances enumerated
+    cdmp_filtered      instances below the CDMP bound (not counted for PI)
+    pruned_cdmp        candidates left with no instance by the CDMP bound
+    pruned_pi          other rejected candidates (PI < min_prev at d2, incl. aborted
+                       and candidates without any instance)
+    aborted            of those, stopped early during enumeration
+    pruned_topk        candidates whose CDMP bound exceeds the top-k cutoff found so far
+                       (skipped unenumerated, serial runs only), or found prevalent above it
+    prevalent          candidates kept
+    peak_table         largest instance table of the level (rows)
+    peak_table_bytes   its size in bytes, when known
+`on_level(k, counters)` is called after each level of range_comine.
+"""
+from typing import Callable, Dict
+from contextlib import contextmanager
+import time
+
+class MiningStats:
+    def __init__(self, on_level: Callable[[int, dict], None] = None):
+        self.phases: Dict[str, float] = {}
+        self.levels: Dict[int, Dict[str, int]] = {}
+        self.on_level = on_level
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - t0)
+
+    def add_time(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, k: int, key: str, n: int = 1):
+        level = self.levels.setdefault(k, {})
+        level[key] = level.get(key, 0) + n
+
+    def peak(self, k: int, key: str, value: int):
+        level = self.levels.setdefault(k, {})
+        if value > level.get(key, 0):
+            level[key] = value
+
+    def level_done(self, k: int):
+        if self.on_level is not None:
+            self.on_level(k, dict(self.levels.get(k, {})))
+
+    def to_dict(self) -> dict:
+        return {"phases": {name: round(t, 6) for name, t in self.phases.items()},
+                "levels": {str(k): dict(sorted(v.items())) for k, v in sorted(self.levels.items())}}
+
+@contextmanager
+def _noop():
+    yield
+
+def phase(stats, name: str):
+    """stats.phase(name), or a no-op context when stats is None."""
+    return stats.phase(name) if stats is not None else _noop()
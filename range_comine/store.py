@@ -0,0 +1,139 @@
+"""Columnar on-disk dataset format, opened with memory mapping.
+
+A dataset is a directory:
+  meta.json        format tag, version, row count, feature dictionary, sort cell
+  codes.npy        int32 feature codes (index into meta["features"], sorted by name)
+  xs.npy, ys.npy   float64 coordinates
+  ids_blob.npy     uint8 UTF-8 bytes of all ids, concatenated
+  ids_offsets.npy  int64, id i is ids_blob[offsets[i]:offsets[i+1]]
+
+Rows may be pre-sorted by grid cell (`sort_cell`), which keeps spatial
+neighbors close on disk.
+"""
+from typing import List, NamedTuple
+from pathlib import Path
+import json, shutil
+import numpy as np
+
+from .data import Obj, load_columns_csv
+
+FORMAT = "range-comine-columns"
+VERSION = 1
+
+class Dataset(NamedTuple):
+    ids_blob: np.ndarray
+    ids_offsets: np.ndarray
+    codes: np.ndarray
+    xs: np.ndarray
+    ys: np.ndarray
+    features: List[str]
+    sort_cell: float
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def ids(self) -> List[str]:
+        blob = self.ids_blob.tobytes()
+        off = self.ids_offsets.tolist()
+        return [blob[off[i]:off[i+1]].decode() for i in range(len(off) - 1)]
+
+def is_dataset(path: str) -> bool:
+    return (Path(path) / "meta.json").is_file()
+
+def save_dataset(path: str, ids, codes, xs, ys, features: List[str], sort_cell: float = None):
+    """Write columns as a dataset directory, optionally sorted by (cx, cy) grid cell of size sort_cell."""
+    out = Path(path)
+    out.mkdir(parents=True, exist_ok=True)
+    codes = np.asarray(codes, dtype=np.int32)
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    if sort_cell:
+        order = np.lexsort((np.floor(ys / sort_cell), np.floor(xs / sort_cell)))
+        codes, xs, ys = codes[order], xs[order], ys[order]
+        ids = [ids[i] for i in order.tolist()]
+    encoded = [i.encode() for i in ids]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    np.save(out / "ids_blob.npy", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+    np.save(out / "ids_offsets.npy", offsets)
+    np.save(out / "codes.npy", codes)
+    np.save(out / "xs.npy", xs)
+    np.save(out / "ys.npy", ys)
+    meta = {"format": FORMAT, "version": VERSION, "n": len(codes),
+            "features": list(features), "sort_cell": sort_cell}
+    (out / "meta.json").write_text(json.dumps(meta, indent=2))
+
+class DatasetWriter:
+    """
+    Streaming counterpart of save_dataset for a known row count: chunks of
+    (ids, codes, xs, ys) go straight into memory-mapped columns (ids through a
+    temporary file), so the full dataset is never held in memory. Rows stay in
+    write order (no sort_cell). codes index `features`, which must be sorted.
+    """
+    def __init__(self, path: str, n: int, features: List[str]):
+        if list(features) != sorted(features):
+            raise ValueError("features must be sorted by name")
+        self.root = Path(path)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.n, self.features, self.row = n, list(features), 0
+        col = lambda name, dtype, size: np.lib.format.open_memmap(self.root / name, "w+", dtype, (size,))
+        self.codes = col("codes.npy", np.int32, n)
+        self.xs = col("xs.npy", np.float64, n)
+        self.ys = col("ys.npy", np.float64, n)
+        self.offsets = col("ids_offsets.npy", np.int64, n + 1)
+        self.offsets[0] = 0
+        self.blob = open(self.root / "ids_blob.tmp", "wb")
+
+    def write(self, ids, codes, xs, ys):
+        m = len(ids)
+        if self.row + m > self.n:
+            raise ValueError(f"more than {self.n} rows written")
+        lo, hi = self.row, self.row + m
+        encoded = [i.encode() for i in ids]
+        self.codes[lo:hi] = codes
+        self.xs[lo:hi] = xs
+        self.ys[lo:hi] = ys
+        np.cumsum([len(b) for b in encoded], out=self.offsets[lo+1:hi+1])
+        self.offsets[lo+1:hi+1] += self.offsets[lo]
+        self.blob.write(b"".join(encoded))
+        self.row = hi
+
+    def close(self) -> Dataset:
+        if self.row != self.n:
+            raise ValueError(f"{self.row} of {self.n} rows written")
+        self.blob.close()
+        for column in (self.codes, self.xs, self.ys, self.offsets):
+            column.flush()
+        self.codes = self.xs = self.ys = self.offsets = None
+        tmp = self.root / "ids_blob.tmp"
+        size = tmp.stat().st_size
+        with open(self.root / "ids_blob.npy", "wb") as out, open(tmp, "rb") as src:
+            np.lib.format.write_array_header_1_0(
+                out, {"descr": "|u1", "fortran_order": False, "shape": (size,)})
+            shutil.copyfileobj(src, out)
+        tmp.unlink()
+        meta = {"format": FORMAT, "version": VERSION, "n": self.n,
+                "features": self.features, "sort_cell": None}
+        (self.root / "meta.json").write_text(json.dumps(meta, indent=2))
+        return open_dataset(str(self.root))
+
+def open_dataset(path: str) -> Dataset:
+    """Open a dataset directory; all columns are read-only memory maps."""
+    root = Path(path)
+    meta = json.loads((root / "meta.json").read_text())
+    if meta.get("format") != FORMAT or meta.get("version") != VERSION:
+        raise ValueError(f"{path}: not a {FORMAT} v{VERSION} dataset")
+    load = lambda name: np.load(root / name, mmap_mode="r")
+    return Dataset(load("ids_blob.npy"), load("ids_offsets.npy"), load("codes.npy"),
+                   load("xs.npy"), load("ys.npy"), meta["features"], meta["sort_cell"])
+
+def dataset_objects(ds: Dataset) -> List[Obj]:
+    """(id, feature, x, y) tuples for the object-list APIs."""
+    names = ds.features
+    return list(zip(ds.ids(), (names[c] for c in ds.codes.tolist()), ds.xs.tolist(), ds.ys.tolist()))
+
+def convert_csv(csv_path: str, out_path: str, sort_cell: float = None, chunk_size: int = 65536) -> Dataset:
+    """One-time conversion of an id,feature,x,y CSV into a dataset directory."""
+    ids, codes, xs, ys, features = load_columns_csv(csv_path, chunk_size)
+    save_dataset(out_path, ids, codes, xs, ys, features, sort_cell=sort_cell)
+    return open_dataset(out_path)
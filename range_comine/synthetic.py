@@ -1,6 +1,10 @@
 
-from typing import List, Tuple
-import random, math
+from typing import Iterator, List, NamedTuple, Sequence, Tuple
+import itertools, random, math
+import numpy as np
+
+from .data import ColumnChunk
+from .store import DatasetWriter
 
 Obj = Tuple[str, str, float, float]
 
@@ -19,3 +23,132 @@ def generate_synthetic(n_features: int = 4, instances_per_feat: int = 8,
             objs.append((oid, f, x, y))
             idx += 1
     return objs
+
+# --- large-scale generator (NumPy, streamed in chunks) ---
+
+class PlantedPattern(NamedTuple):
+    features: Tuple[str, ...]   # feature names, e.g. ("A", "B", "C")
+    count: int                  # number of planted instances
+    diameter: float             # every planted instance fits in a disc of this diameter
+
+class PlantedTruth(NamedTuple):
+    features: Tuple[str, ...]
+    count: int
+    max_diameter: float   # largest actual diameter among the planted instances
+    participation: float  # min over features of count / feature total: a lower bound
+                          # on the pattern's PI at any distance >= max_diameter (for k >= 3,
+                          # range_comine's CDMP bound may still discard small planted instances)
+
+class SyntheticColumns(NamedTuple):
+    features: List[str]          # sorted; codes index this list
+    totals: List[int]            # objects per feature
+    truth: List[PlantedTruth]
+    chunks: Iterator[ColumnChunk]  # ids, int32 codes, float64 xs / ys
+
+    def __len__(self) -> int:
+        return sum(self.totals)
+
+def feature_names(n_features: int) -> List[str]:
+    """A, B, ... for up to 26 features, else F00, F01, ... (name order = index order)."""
+    if n_features <= 26:
+        return [chr(ord('A') + i) for i in range(n_features)]
+    w = len(str(n_features - 1))
+    return [f"F{i:0{w}d}" for i in range(n_features)]
+
+def synthetic_columns(n: int, n_features: int = 4, width: float = 1000.0, height: float = 1000.0,
+                      zipf: float = 0.0, clusters: int = 0, cluster_std: float = None,
+                      planted: Sequence[PlantedPattern] = (), seed: int = 13,
+                      chunk_size: int = 1 << 18) -> SyntheticColumns:
+    """
+    Vectorized generator for up to millions of objects, produced lazily in chunks.
+    n: background objects (planted instances add k * count more)
+    zipf: feature frequencies proportional to 1 / rank**zipf (0 = equal)
+    clusters: > 0 draws background points around that many Gaussian centers
+      (std cluster_std, default side / (4 * sqrt(clusters))), clipped to the box
+    planted: PlantedPattern instances, each placed uniformly in a disc of diameter
+      `diameter` around a uniform anchor; they are emitted first
+    Ids are "<feature>.<row>". The result is deterministic for a given seed and chunk_size.
+    """
+    features = feature_names(n_features)
+    code_of = {f: i for i, f in enumerate(features)}
+    names = np.array(features)
+    bg_rng, plant_rng = (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(2))
+    weights = 1.0 / np.arange(1, n_features + 1) ** zipf
+    bg_counts = bg_rng.multinomial(n, weights / weights.sum())
+    totals = bg_counts.copy()
+    blocks, planted_info = [], []
+    for p in planted:
+        codes = [code_of[f] for f in p.features]
+        if sorted(set(codes)) != codes:
+            raise ValueError(f"planted features must be distinct and sorted: {p.features}")
+        r = p.diameter / 2
+        ax = plant_rng.uniform(r, width - r, p.count)[:, None]
+        ay = plant_rng.uniform(r, height - r, p.count)[:, None]
+        rad = r * np.sqrt(plant_rng.uniform(0, 1, (p.count, len(codes))))
+        ang = plant_rng.uniform(0, 2 * math.pi, (p.count, len(codes)))
+        xs, ys = ax + rad * np.cos(ang), ay + rad * np.sin(ang)
+        # instance diameters, one pair of members at a time
+        dia = np.zeros(p.count)
+        for i, j in itertools.combinations(range(len(codes)), 2):
+            np.maximum(dia, np.hypot(xs[:, i] - xs[:, j], ys[:, i] - ys[:, j]), out=dia)
+        totals[codes] += p.count
+        blocks.append((np.tile(np.array(codes, dtype=np.int32), p.count), xs.ravel(), ys.ravel()))
+        planted_info.append((p, float(dia.max()) if p.count else 0.0))
+    truth = [PlantedTruth(tuple(p.features), p.count, max_dia,
+                          min(p.count / int(totals[code_of[f]]) for f in p.features))
+             for p, max_dia in planted_info]
+    if clusters:
+        std = cluster_std if cluster_std is not None else max(width, height) / (4 * math.sqrt(clusters))
+        centers = np.column_stack((bg_rng.uniform(0, width, clusters), bg_rng.uniform(0, height, clusters)))
+
+    def chunks():
+        row = 0
+        def emit(codes, xs, ys):
+            nonlocal row
+            ids = np.char.add(np.char.add(names[codes], "."), np.arange(row, row + len(codes)).astype(str))
+            row += len(codes)
+            return ColumnChunk(ids.tolist(), codes, xs, ys)
+        for codes, xs, ys in blocks:
+            for lo in range(0, len(codes), chunk_size):
+                yield emit(codes[lo:lo+chunk_size], xs[lo:lo+chunk_size], ys[lo:lo+chunk_size])
+        remaining = bg_counts.copy()
+        while remaining.sum():
+            m = int(min(chunk_size, remaining.sum()))
+            take = bg_rng.multivariate_hypergeometric(remaining, m)
+            remaining -= take
+            codes = np.repeat(np.arange(n_features, dtype=np.int32), take)
+            bg_rng.shuffle(codes)
+            if clusters:
+                c = centers[bg_rng.integers(0, clusters, m)]
+                xs = np.clip(c[:, 0] + bg_rng.normal(0, std, m), 0, width)
+                ys = np.clip(c[:, 1] + bg_rng.normal(0, std, m), 0, height)
+            else:
+                xs, ys = bg_rng.uniform(0, width, m), bg_rng.uniform(0, height, m)
+            yield emit(codes, xs, ys)
+
+    return SyntheticColumns(features, totals.tolist(), truth, chunks())
+
+def synthetic_objects(n: int, **kw) -> List[Obj]:
+    """synthetic_columns(n, **kw) as an (id, feature, x, y) list, for the object-list APIs."""
+    syn = synthetic_columns(n, **kw)
+    out: List[Obj] = []
+    for chunk in syn.chunks:
+        out.extend(zip(chunk.ids, (syn.features[c] for c in chunk.codes.tolist()),
+                       chunk.xs.tolist(), chunk.ys.tolist()))
+    return out
+
+def write_synthetic_csv(path: str, syn: SyntheticColumns):
+    """Stream the chunks to an id,feature,x,y CSV (coordinates round-trip exactly)."""
+    with open(path, "w", newline="") as f:
+        f.write("id,feature,x,y\n")
+        for chunk in syn.chunks:
+            feats = [syn.features[c] for c in chunk.codes.tolist()]
+            f.writelines(f"{i},{ft},{x!r},{y!r}\n"
+                         for i, ft, x, y in zip(chunk.ids, feats, chunk.xs.tolist(), chunk.ys.tolist()))
+
+def write_synthetic_dataset(path: str, syn: SyntheticColumns):
+    """Stream the chunks into a columnar dataset directory (see store.py)."""
+    writer = DatasetWriter(path, len(syn), syn.features)
+    for chunk in syn.chunks:
+        writer.write(chunk.ids, chunk.codes, chunk.xs, chunk.ys)
+    return writer.close()
@@ -0,0 +1,32 @@
+from range_comine.synthetic import generate_synthetic
+from range_comine.mining import range_comine
+from range_comine.approx import range_comine_approx
+
+def test_full_sample_is_exact():
+    objs = generate_synthetic(n_features=4, instances_per_feat=10, seed=3)
+    for d1, d2, min_prev in ((5.0, 30.0, 0.3), (10.0, 40.0, 0.5), (0.0, 25.0, 0.0)):
+        res = range_comine_approx(objs, d1, d2, min_prev, fraction=1.0)
+        assert res.colist == range_comine(objs, d1, d2, min_prev)
+        assert all(e.critical_lo == e.critical == e.critical_hi for e in res.patterns.values())
+
+def test_sampled_pairs_bounds_cover_exact():
+    objs = generate_synthetic(n_features=4, instances_per_feat=200, width=400, height=400, seed=1)
+    exact = {p: d for d, ps in range_comine(objs, 10.0, 30.0, 0.2).items() for p in ps if len(p) == 2}
+    res = range_comine_approx(objs, 10.0, 30.0, 0.2, fraction=0.3, seed=2)
+    pairs = {p: e for p, e in res.patterns.items() if len(p) == 2}
+    assert set(pairs) == set(exact)
+    for p, e in pairs.items():
+        assert e.pi_lo <= e.pi <= e.pi_hi
+        assert e.critical_lo <= exact[p] <= e.critical_hi
+
+def test_verify_resolves_borderline_pairs_exactly():
+    objs = generate_synthetic(n_features=4, instances_per_feat=200, width=400, height=400, seed=1)
+    exact = {p: d for d, ps in range_comine(objs, 10.0, 30.0, 0.8).items() for p in ps if len(p) == 2}
+    res = range_comine_approx(objs, 10.0, 30.0, 0.8, fraction=0.3, seed=2, verify=True)
+    verified = {p: e for p, e in res.patterns.items() if e.verified}
+    assert verified
+    for p, e in verified.items():
+        assert e.pi_lo == e.pi == e.pi_hi
+        if len(p) == 2:
+            assert e.critical == exact[p]
+    assert {p for p in res.patterns if len(p) == 2} == set(exact)
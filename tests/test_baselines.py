@@ -0,0 +1,8 @@
+from range_comine.synthetic import generate_synthetic
+from range_comine.baselines import naive_range, range_inc_mining
+
+def test_event_driven_range_inc_matches_naive():
+    for seed in (1, 5):
+        objs = generate_synthetic(n_features=4, instances_per_feat=5, seed=seed)
+        for d1, d2, min_prev in ((5.0, 30.0, 0.3), (0.0, 50.0, 0.6), (10.0, 40.0, 0.0)):
+            assert range_inc_mining(objs, d1, d2, min_prev) == naive_range(objs, d1, d2, min_prev)
@@ -0,0 +1,22 @@
+import importlib.util
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+spec = importlib.util.spec_from_file_location("bench_suite", ROOT / "benchmarks" / "suite.py")
+suite = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(suite)
+
+def test_run_history_and_compare(tmp_path):
+    base = {"n": 60, "features": 3, "d1": 5.0, "d2": 15.0, "min_prev": 0.3, "clusters": 0, "seed": 1}
+    cases = suite.workload_cases(base, {"n": [60, 90], "clusters": [3]})
+    assert [c["n"] for c in cases] == [60, 90, 60] and cases[2]["clusters"] == 3
+    history = tmp_path / "h.jsonl"
+    assert suite.main(["run", "--n", "60", "--features", "3", "--sizes", "90", "--repeat", "2",
+                       "--benches", "star_csr,range_comine,naive", "--history", str(history)]) == 0
+    records = suite.load_history(history)
+    assert len(records) == 1 and len(records[0]["results"]) == 6
+    assert all(r["peak_kb"] > 0 and len(r["times_ms"]) == 2 for r in records[0]["results"])
+    head = {"results": [dict(r, median_ms=r["median_ms"] * 2) for r in records[0]["results"]]}
+    rows = suite.compare_records(records[0], head, threshold=0.5)
+    assert rows and all(r["time_regression"] and not r["memory_regression"] for r in rows)
+    assert not any(r["time_regression"] for r in suite.compare_records(records[0], records[0]))
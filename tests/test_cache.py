@@ -0,0 +1,20 @@
+from range_comine.synthetic import generate_synthetic
+from range_comine.mining import range_comine
+from range_comine.cache import InstanceCache
+
+def test_cache_answers_smaller_d2_and_any_min_prev():
+    objs = generate_synthetic(n_features=4, instances_per_feat=6, seed=5)
+    cache = InstanceCache()
+    cache.prepare(objs, 40.0)
+    for d1, d2 in ((5.0, 20.0), (10.0, 40.0), (5.0, 30.0)):
+        for min_prev in (0.2, 0.5):
+            assert cache.range_comine(objs, d1, d2, min_prev) == range_comine(objs, d1, d2, min_prev)
+    assert len(cache.entries) == 1
+
+def test_cache_lru_eviction():
+    a = generate_synthetic(n_features=3, instances_per_feat=5, seed=1)
+    b = generate_synthetic(n_features=3, instances_per_feat=5, seed=2)
+    cache = InstanceCache(max_bytes=1)
+    cache.range_comine(a, 5.0, 30.0, 0.3)
+    cache.range_comine(b, 5.0, 30.0, 0.3)
+    assert len(cache.entries) == 1 and cache.prepare(b, 30.0) is next(iter(cache.entries.values()))
@@ -0,0 +1,30 @@
+from pathlib import Path
+from range_comine.data import iter_csv_chunks, load_columns_csv, load_objects_csv
+from range_comine.neighbors import grid_index
+
+ROOT = Path(__file__).resolve().parents[1]
+TOY = str(ROOT / "examples" / "toy.csv")
+
+def test_chunked_columns_match_objects():
+    objs = load_objects_csv(TOY)
+    assert objs[0] == ("A.1", "A", 0.0, 0.0) and len(objs) == 12
+    ids, codes, xs, ys, features = load_columns_csv(TOY, chunk_size=5)
+    assert list(zip(ids, (features[c] for c in codes), xs, ys)) == objs
+    assert features == sorted({o[1] for o in objs})
+
+def test_grid_fed_incrementally_from_chunks():
+    ids, codes, xs, ys, _ = load_columns_csv(TOY)
+    grid, offset = {}, 0
+    for chunk in iter_csv_chunks(TOY, chunk_size=5):
+        grid_index(chunk.xs, chunk.ys, 6.0, grid, offset)
+        offset += len(chunk.ids)
+    assert grid == grid_index(xs, ys, 6.0)
+
+def test_blank_lines_and_empty_files(tmp_path):
+    path = tmp_path / "blank.csv"
+    path.write_text("id,feature,x,y\nA.1,A,1.0,2.0\n\nB.1,B,3.0,4.0\n\n")
+    assert load_objects_csv(str(path)) == [("A.1", "A", 1.0, 2.0), ("B.1", "B", 3.0, 4.0)]
+    for text in ("", "id,feature,x,y\n", "\nid,feature,x,y\n\n"):
+        path.write_text(text)
+        assert load_objects_csv(str(path)) == []
+        assert load_columns_csv(str(path))[0] == []
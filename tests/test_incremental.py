@@ -0,0 +1,46 @@
+import random
+import pytest
+from range_comine.synthetic import generate_synthetic
+from range_comine.mining import range_comine
+from range_comine.incremental import IncrementalMiner
+
+def test_incremental_matches_full_rerun():
+    rng = random.Random(4)
+    objs = generate_synthetic(n_features=4, instances_per_feat=10, seed=4)
+    rng.shuffle(objs)
+    live, pool = objs[:20], objs[20:]
+    miner = IncrementalMiner(5.0, 30.0, 0.3, live)
+    assert miner.colist() == range_comine(live, 5.0, 30.0, 0.3)
+    for step in range(10):
+        if step % 3 != 2:
+            batch = [pool.pop() for _ in range(min(len(pool), 3))]
+            miner.add_objects(batch)
+            live = live + batch
+        else:
+            gone = rng.sample(live, 4)
+            miner.remove_objects([o[0] for o in gone])
+            live = [o for o in live if o not in gone]
+        assert miner.colist() == range_comine(live, 5.0, 30.0, 0.3)
+
+def test_incremental_feature_removed_and_readded():
+    objs = generate_synthetic(n_features=3, instances_per_feat=8, seed=7)
+    a = [o for o in objs if o[1] == 'A']
+    rest = [o for o in objs if o[1] != 'A']
+    miner = IncrementalMiner(10.0, 40.0, 0.4, objs)
+    miner.remove_objects([o[0] for o in a])
+    assert miner.colist() == range_comine(rest, 10.0, 40.0, 0.4)
+    miner.add_objects(a)
+    assert miner.colist() == range_comine(objs, 10.0, 40.0, 0.4)
+    with pytest.raises(ValueError):
+        miner.add_objects(a[:1])
+
+def test_incremental_remove_validates_before_mutating():
+    objs = [("A.1", "A", 0.0, 0.0), ("B.1", "B", 1.0, 0.0), ("A.2", "A", 50.0, 50.0), ("B.2", "B", 90.0, 10.0)]
+    miner = IncrementalMiner(1.0, 5.0, 0.5, objs)
+    before = miner.colist()
+    for bad in (["A.1", "nope"], ["A.1", "A.1"]):
+        with pytest.raises(ValueError):
+            miner.remove_objects(bad)
+        assert miner.colist() == before
+    miner.add_objects([("A.9", "A", 70.0, 70.0)])
+    assert miner.colist() == range_comine(objs + [("A.9", "A", 70.0, 70.0)], 1.0, 5.0, 0.5)
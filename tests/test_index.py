@@ -0,0 +1,34 @@
+import json
+import pytest
+from range_comine.synthetic import generate_synthetic
+from range_comine.mining import range_comine
+from range_comine.index import RangeIndex
+from range_comine.cli import main
+
+def test_index_matches_range_comine(tmp_path):
+    objs = generate_synthetic(n_features=4, instances_per_feat=8, seed=3)
+    index = RangeIndex.build(objs, 40.0)
+    index.save(str(tmp_path / "idx.npz"))
+    loaded = RangeIndex.load(str(tmp_path / "idx.npz"))
+    for d1, d2 in ((5.0, 20.0), (10.0, 40.0), (20.0, 25.0), (0.0, 30.0)):
+        for min_prev in (0.0, 0.25, 0.5, 0.9):
+            expected = range_comine(objs, d1, d2, min_prev)
+            assert index.query(d1, d2, min_prev) == expected
+            assert loaded.query(d1, d2, min_prev) == expected
+
+def test_index_limits_and_cli(tmp_path, capsys):
+    objs = generate_synthetic(n_features=3, instances_per_feat=6, seed=2)
+    index = RangeIndex.build(objs, 30.0, min_prev_floor=0.3)
+    assert index.query(10.0, 30.0, 0.4) == range_comine(objs, 10.0, 30.0, 0.4)
+    with pytest.raises(ValueError):
+        index.query(10.0, 31.0, 0.4)
+    with pytest.raises(ValueError):
+        index.query(10.0, 30.0, 0.2)
+    csv = tmp_path / "o.csv"
+    csv.write_text("id,feature,x,y\n" + "".join(f"{i},{f},{x},{y}\n" for i, f, x, y in objs))
+    main(['index', str(tmp_path / "i.npz"), '--csv', str(csv), '--dmax', '30'])
+    capsys.readouterr()
+    main(['--index', str(tmp_path / "i.npz"), '--d1', '10', '--d2', '25', '--min_prev', '0.5'])
+    out = json.loads(capsys.readouterr().out)
+    expected = range_comine(objs, 10.0, 25.0, 0.5)
+    assert out == {str(d): [list(p) for p in v] for d, v in expected.items()}
@@ -0,0 +1,186 @@
+import itertools, math, random
+from collections import defaultdict
+from range_comine.synthetic import generate_synthetic
+from range_comine.neighbors import build_star_neighborhood
+from range_comine.mining import filter_k_cliques, candidate_join
+
+def _brute_force_cliques(cand, objects_by_id, dmax):
+    by_feat = {f: [o for o in objects_by_id.values() if o[1] == f] for f in cand}
+    out = {}
+    for combo in itertools.product(*(by_feat[f] for f in cand)):
+        dia = max(math.hypot(a[2]-b[2], a[3]-b[3]) for a, b in itertools.combinations(combo, 2))
+        if dia <= dmax:
+            out[tuple(sorted(o[0] for o in combo))] = dia
+    return out
+
+def test_filter_k_cliques_matches_brute_force():
+    objs = generate_synthetic(n_features=5, instances_per_feat=7, seed=11)
+    star, objects_by_id, features = build_star_neighborhood(objs, 40.0)
+    for k in (3, 4, 5):
+        for cand in itertools.combinations(features, k):
+            for dmax in (25.0, 40.0):
+                got = filter_k_cliques(cand, star, objects_by_id, dmax)
+                assert len(got) == len({cid for cid, _ in got})
+                assert dict(got) == _brute_force_cliques(cand, objects_by_id, dmax)
+
+def test_join_tables_matches_filter_k_cliques():
+    from range_comine.context import DatasetContext
+    from range_comine.neighbors import build_star_arrays
+    from range_comine.instances import size2_table, join_tables
+    objs = generate_synthetic(n_features=4, instances_per_feat=8, seed=4)
+    star, objects_by_id, features = build_star_neighborhood(objs, 35.0)
+    ctx = DatasetContext(objects_by_id)
+    star_i = build_star_arrays(ctx.xs, ctx.ys, ctx.codes, 35.0)
+    tables = {pair: size2_table(pair, star_i, ctx.codes, 35.0) for pair in itertools.combinations(range(4), 2)}
+    for k in (3, 4):
+        next_tables = {}
+        for cand in itertools.combinations(range(4), k):
+            table = join_tables(tables[cand[:-1]], tables[cand[:-2] + cand[-1:]], ctx.xs, ctx.ys, 35.0)
+            assert all(tuple(ctx.codes[o] for o in row) == cand for row, _ in table)
+            got = {tuple(sorted(ctx.ids[o] for o in row)): dia for row, dia in table}
+            assert got == dict(filter_k_cliques(ctx.pattern_names(cand), star, objects_by_id, 35.0))
+            next_tables[cand] = table
+        tables = next_tables
+
+def test_single_pass_size2_matches_per_pair():
+    from range_comine.context import DatasetContext
+    from range_comine.neighbors import build_star_arrays
+    from range_comine.instances import size2_table, size2_tables
+    from range_comine.mining import enumerate_size2_cliques, size2_cliques_by_pair
+    objs = generate_synthetic(n_features=5, instances_per_feat=8, seed=9)
+    star, objects_by_id, features = build_star_neighborhood(objs, 30.0)
+    by_pair = size2_cliques_by_pair(star, objects_by_id, 20.0)
+    ctx = DatasetContext(objects_by_id)
+    star_i = build_star_arrays(ctx.xs, ctx.ys, ctx.codes, 30.0)
+    tables = size2_tables(star_i, ctx.codes, 20.0)
+    for pair in itertools.combinations(range(5), 2):
+        assert list(tables.get(pair, [])) == list(size2_table(pair, star_i, ctx.codes, 20.0))
+        names = ctx.pattern_names(pair)
+        expected = [c for c in enumerate_size2_cliques(names, star, objects_by_id, 30.0) if c[1] <= 20.0]
+        assert by_pair.get(names, []) == expected
+
+def test_participation_bound_aborts_only_hopeless_candidates():
+    from range_comine.context import DatasetContext
+    from range_comine.neighbors import build_star_arrays
+    from range_comine.instances import ParticipationBound, size2_table, join_tables, first_participation
+    from range_comine.metrics import pi_from_participants
+    objs = generate_synthetic(n_features=4, instances_per_feat=10, seed=6)
+    ctx = DatasetContext.from_objects(objs)
+    star = build_star_arrays(ctx.xs, ctx.ys, ctx.codes, 15.0)
+    tables = {pair: size2_table(pair, star, ctx.codes, 15.0) for pair in itertools.combinations(range(4), 2)}
+    aborted = 0
+    for min_prev in (0.1, 0.3, 0.5, 0.8):
+        for cand in itertools.combinations(range(4), 3):
+            full = join_tables(tables[cand[:-1]], tables[cand[:-2] + cand[-1:]], ctx.xs, ctx.ys, 15.0)
+            bounded = join_tables(tables[cand[:-1]], tables[cand[:-2] + cand[-1:]], ctx.xs, ctx.ys, 15.0,
+                                  ParticipationBound(ctx.totals, min_prev, 5.0), ctx.codes)
+            pi = pi_from_participants(first_participation(full, 5.0), ctx.codes, ctx.totals)
+            if bounded is None:
+                aborted += 1
+                assert pi < min_prev
+            else:
+                assert sorted(bounded) == sorted(full)
+    assert aborted
+
+def test_critical_distance_sweep():
+    from range_comine.mining import _critical_distance_from_cliques
+    objects_by_id = {oid: (oid, oid[0], 0.0, 0.0) for oid in ("A.1", "A.2", "B.1", "B.2", "B.3")}
+    cliques = [(("A.1", "B.1"), 4.0), (("A.1", "B.2"), 2.0), (("A.2", "B.2"), 6.0), (("A.2", "B.3"), 9.0)]
+    # PI: 1/3 at 2, 1/2 at 4, 2/3 at 6, 1 at 9
+    assert _critical_distance_from_cliques(cliques, objects_by_id, 0.5, 1.0) == 4.0
+    assert _critical_distance_from_cliques(cliques, objects_by_id, 0.6, 1.0) == 6.0
+    assert _critical_distance_from_cliques(cliques, objects_by_id, 1.0, 1.0) == 9.0
+    assert _critical_distance_from_cliques(cliques, objects_by_id, 0.3, 3.0) == 4.0
+    assert _critical_distance_from_cliques(cliques, objects_by_id, 0.3, 10.0) is None
+    assert _critical_distance_from_cliques([], objects_by_id, 0.3, 1.0) is None
+
+def test_dataset_context_totals_and_shared_pi():
+    from range_comine.context import DatasetContext
+    from range_comine.metrics import participation_index
+    objs = generate_synthetic(n_features=3, instances_per_feat=5, seed=2)
+    star, objects_by_id, features = build_star_neighborhood(objs, 40.0)
+    ctx = DatasetContext(objects_by_id)
+    assert ctx.features == features and ctx.feature_totals == {f: 5 for f in features}
+    assert [ctx.ids[ctx.index[oid]] for oid in objects_by_id] == list(objects_by_id)
+    cliques = filter_k_cliques(tuple(features), star, objects_by_id, 40.0)
+    assert participation_index(cliques, objects_by_id, ctx) == participation_index(cliques, objects_by_id)
+
+def test_range_comine_workers_match_sequential():
+    from range_comine.mining import range_comine
+    objs = generate_synthetic(n_features=5, instances_per_feat=6, seed=13)
+    assert range_comine(objs, 5.0, 40.0, 0.3, workers=2) == range_comine(objs, 5.0, 40.0, 0.3)
+
+def test_size2_tables_freed_after_level_2():
+    from range_comine.context import DatasetContext
+    from range_comine.neighbors import build_star_arrays
+    from range_comine.instances import size2_tables
+    from range_comine.mining import _star_join_instances, mine_levels, range_comine
+    objs = generate_synthetic(n_features=5, instances_per_feat=6, seed=13)
+    ctx = DatasetContext.from_objects(objs)
+    for workers in (None, 2):
+        pairs = size2_tables(build_star_arrays(ctx.xs, ctx.ys, ctx.codes, 40.0), ctx.codes, 40.0)
+        assert pairs
+        col = mine_levels(ctx, _star_join_instances(ctx, 40.0), 5.0, 0.3, workers, pairs=pairs)
+        assert col == range_comine(objs, 5.0, 40.0, 0.3) and not pairs
+
+def test_candidate_join_matches_apriori_definition():
+    rng = random.Random(2)
+    feats = 'ABCDEFG'
+    for _ in range(50):
+        k = rng.randint(1, 3)
+        prev = {tuple(sorted(rng.sample(feats, k))) for _ in range(rng.randint(0, 25))}
+        expected = sorted(c for c in itertools.combinations(feats, k + 1)
+                          if all(s in prev for s in itertools.combinations(c, k)))
+        assert candidate_join([tuple(reversed(p)) for p in prev]) == expected
+
+def test_iter_range_comine_streams_colist(tmp_path):
+    import json
+    from collections import defaultdict
+    from range_comine.mining import range_comine, iter_range_comine
+    from range_comine.cli import main
+    objs = generate_synthetic(n_features=5, instances_per_feat=8, seed=7)
+    expected = range_comine(objs, 5.0, 30.0, 0.3)
+    streamed = list(iter_range_comine(objs, 5.0, 30.0, 0.3))
+    assert [len(p) for _, p in streamed] == sorted(len(p) for _, p in streamed)
+    col = defaultdict(list)
+    for d, p in streamed:
+        col[d].append(p)
+    assert {d: sorted(v) for d, v in col.items()} == expected
+    main(['--synthetic', '--features', '4', '--d1', '5', '--output', 'ndjson', '--out', str(tmp_path / "o.ndjson")])
+    lines = [json.loads(l) for l in (tmp_path / "o.ndjson").read_text().splitlines()]
+    col = defaultdict(list)
+    for rec in lines:
+        col[rec["critical_distance"]].append(tuple(rec["pattern"]))
+    assert {d: sorted(v) for d, v in col.items()} == range_comine(generate_synthetic(n_features=4, instances_per_feat=8), 5.0, 30.0, 0.5)
+
+def test_max_size_and_top_k_match_full_mining():
+    from range_comine.mining import range_comine
+    objs = generate_synthetic(n_features=6, instances_per_feat=12, seed=8)
+    for d1, d2, min_prev in ((5.0, 30.0, 0.3), (0.0, 45.0, 0.5)):
+        full = range_comine(objs, d1, d2, min_prev)
+        ranked = sorted((d, len(p), p) for d, pats in full.items() for p in pats if len(p) >= 2)
+        assert range_comine(objs, d1, d2, min_prev, max_size=2) == \
+            {d: v for d, v in ((d, [p for p in pats if len(p) <= 2]) for d, pats in full.items()) if v}
+        for k in (1, 4, 12, 1000):
+            expected = defaultdict(list)
+            for d, _, p in ranked[:k]:
+                expected[d].append(p)
+            assert range_comine(objs, d1, d2, min_prev, top_k=k) == {d: sorted(v) for d, v in sorted(expected.items())}
+
+def test_top_k_skips_candidates_above_the_live_cutoff():
+    from range_comine.context import DatasetContext
+    from range_comine.neighbors import build_star_arrays
+    from range_comine.instances import size2_tables
+    from range_comine.mining import _star_join_instances, mine_levels, range_comine
+    from range_comine.stats import MiningStats
+    objs = generate_synthetic(n_features=6, instances_per_feat=12, seed=2)
+    ctx = DatasetContext.from_objects(objs)
+    pairs = size2_tables(build_star_arrays(ctx.xs, ctx.ys, ctx.codes, 50.0), ctx.codes, 50.0)
+    instances, enumerated = _star_join_instances(ctx, 50.0), []
+    def counting(cand, tables_prev, bound=None):
+        enumerated.append(cand)
+        return instances(cand, tables_prev, bound)
+    stats = MiningStats()
+    col = mine_levels(ctx, counting, 0.0, 0.3, stats=stats, top_k=15, pairs=pairs)
+    assert col == range_comine(objs, 0.0, 50.0, 0.3, top_k=15)
+    assert len(enumerated) < sum(c["candidates"] for c in stats.levels.values())
@@ -0,0 +1,32 @@
+from pathlib import Path
+from range_comine.synthetic import generate_synthetic
+from range_comine.data import load_objects_csv
+from range_comine.neighbors import build_star_neighborhood, build_star_neighborhood_naive
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def test_grid_star_matches_naive():
+    objs = generate_synthetic(n_features=4, instances_per_feat=25, seed=3)
+    for dmax in (0.0, 7.5, 20.0, 150.0):
+        assert build_star_neighborhood(objs, dmax) == build_star_neighborhood_naive(objs, dmax)
+
+def test_grid_star_negative_coordinates():
+    objs = [(o[0], o[1], o[2] - 13.0, -o[3]) for o in load_objects_csv(str(ROOT / "examples" / "toy.csv"))]
+    assert build_star_neighborhood(objs, 9.0) == build_star_neighborhood_naive(objs, 9.0)
+
+def test_csr_star_matches_dict_star():
+    import numpy as np
+    from range_comine.neighbors import build_star_csr, objects_to_arrays, star_from_csr
+    objs = generate_synthetic(n_features=4, instances_per_feat=25, seed=3)
+    xs, ys, codes, feats = objects_to_arrays(objs)
+    cols = objects_to_arrays(objs, backend="array")
+    assert [list(c) for c in cols[:3]] == [xs.tolist(), ys.tolist(), codes.tolist()] and cols[3] == feats
+    ref_star, ref_by_id, ref_feats = build_star_neighborhood(objs, 20.0)
+    csr = build_star_csr(xs, ys, codes, 20.0, block=7, dist_dtype=np.float64)
+    assert csr.indices.dtype == np.int32 and len(csr.offsets) == len(objs) + 1
+    star, by_id, feats = star_from_csr(csr, objs)
+    assert (by_id, feats) == (ref_by_id, ref_feats)
+    assert star.keys() == ref_star.keys()
+    for oid, neighs in ref_star.items():
+        assert [(n, f) for n, f, _ in star[oid]] == [(n, f) for n, f, _ in neighs]
+        assert np.allclose([d for *_, d in star[oid]], [d for *_, d in neighs])
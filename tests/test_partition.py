@@ -0,0 +1,29 @@
+from range_comine.synthetic import generate_synthetic
+from range_comine.mining import range_comine
+from range_comine.partition import partition_tiles, range_comine_partitioned
+
+def test_tiles_own_each_object_once():
+    objs = generate_synthetic(n_features=3, instances_per_feat=10, seed=1)
+    xs = [o[2] for o in objs]; ys = [o[3] for o in objs]
+    tiles = partition_tiles(xs, ys, 25.0, 10.0)
+    owned = sorted(g for gids, own in tiles.values() for g, o in zip(gids, own) if o)
+    assert owned == list(range(len(objs)))
+
+def test_partitioned_matches_range_comine():
+    objs = generate_synthetic(n_features=5, instances_per_feat=6, seed=13)
+    ref = range_comine(objs, 5.0, 40.0, 0.3)
+    # tiles smaller than d2 force most cliques across borders
+    assert range_comine_partitioned(objs, 5.0, 40.0, 0.3, tile_size=15.0) == ref
+    assert range_comine_partitioned(objs, 5.0, 40.0, 0.3, tile_size=30.0, workers=2) == ref
+
+def test_tile_specs_build_only_wanted_tiles():
+    from range_comine.partition import core_tiles, tile_specs
+    objs = generate_synthetic(n_features=3, instances_per_feat=20, seed=4)
+    xs = [o[2] for o in objs]; ys = [o[3] for o in objs]; codes = [ord(o[1]) - 65 for o in objs]
+    full = partition_tiles(xs, ys, 25.0, 10.0)
+    tiles = core_tiles(xs, ys, 25.0)
+    assert tiles == list(full)
+    wanted = tiles[1::3]
+    specs = list(tile_specs(xs, ys, codes, 25.0, 10.0, wanted, chunk_size=7))
+    assert [(list(s[0]), list(s[1])) for s in specs] == [(list(full[t][0]), list(full[t][1])) for t in wanted]
+    assert all(list(s[4]) == [codes[g] for g in s[0]] for s in specs)
@@ -0,0 +1,83 @@
+import asyncio, json
+from range_comine.synthetic import generate_synthetic
+from range_comine.mining import range_comine
+from range_comine.baselines import range_inc_mining
+from range_comine.server import QueryServer
+
+def _json_colist(col):
+    return json.loads(json.dumps(col, sort_keys=True))
+
+async def _raw(port, request: bytes):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(request)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response
+
+async def _get(port, target, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    method = "POST" if body is not None else "GET"
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: x\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+def test_server_answers_and_coalesces():
+    objs = generate_synthetic(n_features=4, instances_per_feat=10, seed=3)
+
+    async def run():
+        server = QueryServer({"toy": objs}, warm_dmax=40.0)
+        srv = await server.start(port=0)
+        port = srv.sockets[0].getsockname()[1]
+        try:
+            status, col = await _get(port, "/query?dataset=toy&d1=5&d2=30&min_prev=0.4")
+            assert status == 200 and col == _json_colist(range_comine(objs, 5.0, 30.0, 0.4))
+            status, col = await _get(port, "/query", {"dataset": "toy", "d1": 5, "d2": 25, "min_prev": 0.3,
+                                                       "algo": "range_inc"})
+            assert status == 200 and col == _json_colist(range_inc_mining(objs, 5.0, 25.0, 0.3))
+            assert (await _get(port, "/query?dataset=nope&d1=5&d2=30&min_prev=0.4"))[0] == 404
+            assert (await _get(port, "/query?dataset=toy&d1=5"))[0] == 400
+            status, info = await _get(port, "/datasets")
+            assert info == {"toy": {"objects": 40, "features": ["A", "B", "C", "D"]}}
+            bad = await _raw(port, b"POST /query HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+            assert bad.startswith(b"HTTP/1.1 400")
+            before = server.computed
+            answers = await asyncio.gather(*(server.query("toy", 2.0, 35.0, 0.5) for _ in range(5)))
+            assert server.computed == before + 1 and len(set(answers)) == 1
+        finally:
+            await server.close()
+    asyncio.run(run())
+
+def test_server_fingerprints_datasets_once(monkeypatch):
+    import range_comine.cache as cache
+    objs = generate_synthetic(n_features=3, instances_per_feat=6, seed=1)
+    calls = []
+    real = cache.dataset_fingerprint
+    monkeypatch.setattr(cache, "dataset_fingerprint", lambda o: calls.append(1) or real(o))
+
+    async def run():
+        server = QueryServer({"toy": objs}, warm_dmax=30.0)
+        try:
+            for d2 in (20.0, 30.0, 35.0):
+                assert json.loads(await server.query("toy", 5.0, d2, 0.3)) == _json_colist(range_comine(objs, 5.0, d2, 0.3))
+        finally:
+            await server.close()
+    asyncio.run(run())
+    assert not calls
+
+def test_server_forked_workers():
+    objs = generate_synthetic(n_features=4, instances_per_feat=8, seed=5)
+
+    async def run():
+        server = QueryServer({"toy": objs}, warm_dmax=30.0, workers=2)
+        try:
+            answers = await asyncio.gather(*(server.query("toy", 5.0, d2, 0.3) for d2 in (20.0, 25.0, 30.0)))
+            assert [json.loads(a) for a in answers] == [_json_colist(range_comine(objs, 5.0, d2, 0.3))
+                                                         for d2 in (20.0, 25.0, 30.0)]
+        finally:
+            await server.close()
+    asyncio.run(run())
@@ -0,0 +1,43 @@
+from range_comine.synthetic import generate_synthetic
+from range_comine.mining import range_comine
+from range_comine.baselines import naive_range, range_inc_mining
+from range_comine.stats import MiningStats
+
+def _assert_counters_add_up(stats):
+    for k, c in stats.levels.items():
+        rejected = c.get("pruned_cdmp", 0) + c.get("pruned_pi", 0) + c.get("pruned_topk", 0)
+        assert c["candidates"] == c["prevalent"] + rejected
+        assert c.get("aborted", 0) <= c.get("pruned_pi", 0)
+
+def test_stats_do_not_change_results_and_add_up():
+    objs = generate_synthetic(n_features=5, instances_per_feat=10, seed=3)
+    seen = []
+    stats = MiningStats(on_level=lambda k, counters: seen.append(k))
+    assert range_comine(objs, 5.0, 30.0, 0.4, stats=stats) == range_comine(objs, 5.0, 30.0, 0.4)
+    assert seen == sorted(stats.levels)
+    _assert_counters_add_up(stats)
+    assert {"context", "star", "size2_tables", "level_2"} <= set(stats.phases)
+    d = stats.to_dict()
+    assert d["levels"]["2"]["candidates"] == 10
+
+def test_baseline_stats():
+    objs = generate_synthetic(n_features=4, instances_per_feat=6, seed=5)
+    for fn in (naive_range, range_inc_mining):
+        stats = MiningStats()
+        assert fn(objs, 5.0, 30.0, 0.4, stats=stats) == fn(objs, 5.0, 30.0, 0.4)
+        assert stats.levels[2]["candidates"] >= 6 and "cliques" in stats.phases
+
+def test_stats_count_candidates_without_instances():
+    # sparse: several pairs have no instance within d2
+    objs = generate_synthetic(n_features=6, instances_per_feat=5, seed=3)
+    stats = MiningStats()
+    range_comine(objs, 1.0, 8.0, 0.2, stats=stats)
+    assert stats.levels[2]["candidates"] == 15 and stats.levels[2]["prevalent"] < 15
+    _assert_counters_add_up(stats)
+
+def test_stats_add_up_with_top_k():
+    objs = generate_synthetic(n_features=5, instances_per_feat=10, seed=3)
+    stats = MiningStats()
+    range_comine(objs, 5.0, 30.0, 0.4, top_k=3, stats=stats)
+    assert stats.levels[2]["pruned_topk"] > 0
+    _assert_counters_add_up(stats)
@@ -0,0 +1,24 @@
+import json
+import numpy as np
+from pathlib import Path
+from range_comine.data import load_objects_csv
+from range_comine.store import convert_csv, dataset_objects
+from range_comine import cli
+
+ROOT = Path(__file__).resolve().parents[1]
+TOY = str(ROOT / "examples" / "toy.csv")
+
+def test_convert_roundtrip_mmap(tmp_path):
+    ds = convert_csv(TOY, str(tmp_path / "toy"))
+    assert isinstance(ds.xs, np.memmap)
+    assert dataset_objects(ds) == load_objects_csv(TOY)
+    ds_sorted = convert_csv(TOY, str(tmp_path / "toy_sorted"), sort_cell=10.0)
+    assert sorted(dataset_objects(ds_sorted)) == sorted(load_objects_csv(TOY))
+
+def test_cli_convert_then_mine(tmp_path, capsys):
+    cli.main(["convert", TOY, str(tmp_path / "toy")])
+    capsys.readouterr()
+    cli.main(["--data", str(tmp_path / "toy"), "--d1", "3", "--d2", "8"])
+    from_data = json.loads(capsys.readouterr().out)
+    cli.main(["--csv", TOY, "--d1", "3", "--d2", "8"])
+    assert from_data == json.loads(capsys.readouterr().out)
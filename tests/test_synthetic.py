@@ -0,0 +1,37 @@
+from range_comine.synthetic import (synthetic_columns, synthetic_objects, PlantedPattern,
+                                    write_synthetic_csv, write_synthetic_dataset)
+from range_comine.data import load_objects_csv
+from range_comine.store import open_dataset, dataset_objects
+from range_comine.mining import range_comine
+from range_comine.neighbors import build_star_neighborhood
+from range_comine.mining import filter_k_cliques
+from range_comine.metrics import participation_index
+
+def test_synthetic_columns_shape_and_writers(tmp_path):
+    kw = dict(n_features=5, zipf=1.2, clusters=3, seed=4, chunk_size=100,
+              planted=[PlantedPattern(("A", "C"), 10, 2.0)])
+    syn = synthetic_columns(1000, **kw)
+    assert len(syn) == 1020 and syn.features == ["A", "B", "C", "D", "E"]
+    assert syn.totals[0] > syn.totals[4]   # Zipf skew
+    objs = synthetic_objects(1000, **kw)
+    assert len(objs) == 1020 and len({o[0] for o in objs}) == 1020
+    assert [sum(o[1] == f for o in objs) for f in syn.features] == syn.totals
+    assert all(0 <= o[2] <= 1000 and 0 <= o[3] <= 1000 for o in objs)
+    write_synthetic_csv(str(tmp_path / "s.csv"), synthetic_columns(1000, **kw))
+    assert load_objects_csv(str(tmp_path / "s.csv")) == objs
+    ds = write_synthetic_dataset(str(tmp_path / "ds"), synthetic_columns(1000, **kw))
+    assert dataset_objects(ds) == dataset_objects(open_dataset(str(tmp_path / "ds"))) == objs
+
+def test_planted_patterns_match_ground_truth():
+    planted = [PlantedPattern(("A", "B"), 30, 3.0), PlantedPattern(("B", "C", "D"), 25, 4.0)]
+    syn = synthetic_columns(400, n_features=4, width=500.0, height=500.0, planted=planted, seed=2)
+    objs = synthetic_objects(400, n_features=4, width=500.0, height=500.0, planted=planted, seed=2)
+    pair, triple = syn.truth
+    assert pair.max_diameter <= 3.0 and triple.max_diameter <= 4.0
+    col = range_comine(objs, 0.5, 10.0, pair.participation)
+    found = {tuple(p): d for d, pats in col.items() for p in pats}
+    assert found[("A", "B")] <= pair.max_diameter
+    d = triple.max_diameter
+    star, objects_by_id, _ = build_star_neighborhood(objs, d)
+    pi = participation_index(filter_k_cliques(triple.features, star, objects_by_id, d), objects_by_id)
+    assert pi >= triple.participation